@@ -0,0 +1,44 @@
+import argparse
+import asyncio
+import sys
+
+from bot.database import GameStatsDatabase
+from bot.stats import STAT_NAMES
+from benchmarks.fake_supabase import FakeSupabase
+
+GUILD_ID = 1406313376279298088
+USER_ID = 1
+GAME = 'r6s'
+
+async def main():
+    parser = argparse.ArgumentParser(description='Concurrent insert_or_update_stat calls must not lose increments')
+    parser.add_argument('--admins', type=int, default=50)
+    parser.add_argument('--edits', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.005)
+    args = parser.parse_args()
+
+    db = GameStatsDatabase(client=FakeSupabase(latency=args.latency), max_workers=args.admins)
+
+    async def admin():
+        for _ in range(args.edits):
+            await db.insert_or_update_stat(GUILD_ID, USER_ID, GAME, kills=2, deaths=1, wins=1, earnings=5)
+
+    await asyncio.gather(*(admin() for _ in range(args.admins)))
+    stats = dict(zip(STAT_NAMES, await db.get_stats(GUILD_ID, USER_ID, GAME)))
+    await db.close()
+
+    edits = args.admins * args.edits
+    expected = {'kills': edits * 2, 'deaths': edits, 'wins': edits, 'earnings': edits * 5}
+    lost = {stat: expected[stat] - stats[stat] for stat in expected if stats[stat] != expected[stat]}
+
+    print(f"{edits} concurrent edits from {args.admins} admins")
+    for stat, value in expected.items():
+        print(f"  {stat:<10} expected {value:>8} got {stats[stat]:>8}")
+
+    if lost:
+        print(f"Lost increments: {lost}")
+        sys.exit(1)
+    print("No lost increments")
+
+if __name__ == '__main__':
+    asyncio.run(main())
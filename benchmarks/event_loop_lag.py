@@ -0,0 +1,98 @@
+import argparse
+import asyncio
+import math
+import random
+import statistics
+import time
+
+from bot.database import GameStatsDatabase
+from bot.supabase_backend import SupabaseBackend
+from benchmarks.fake_supabase import FakeSupabase, derive_game_stats
+
+GUILD_ID = 1406313376279298088
+GAMES = ['r6s', 'bf6']
+
+class BlockingSupabaseBackend(SupabaseBackend):
+    async def _execute(self, query):
+        return query.execute()
+
+def seed(client, members):
+    for user_id in range(1, members + 1):
+        for game in GAMES:
+            client.tables['game_stats'].append(derive_game_stats({
+                'server_id': GUILD_ID,
+                'user_id': user_id,
+                'game_name': game,
+                'tournaments_played': random.randint(0, 50),
+                'tournaments_won': random.randint(0, 10),
+                'earnings': random.randint(0, 10000),
+                'kills': random.randint(0, 5000),
+                'deaths': random.randint(0, 5000),
+                'wins': random.randint(0, 500),
+                'losses': random.randint(0, 500)
+            }))
+
+def percentile(samples, fraction):
+    # Nearest-rank: the smallest sample with at least `fraction` of samples at or below it.
+    return samples[max(0, math.ceil(len(samples) * fraction) - 1)]
+
+async def monitor_lag(interval, lags, stop):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, loop.time() - expected))
+
+async def run(db, calls, members, interval):
+    lags = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(monitor_lag(interval, lags, stop))
+    await asyncio.sleep(interval * 2)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        db.get_stats(GUILD_ID, random.randint(1, members), None, stat=None)
+        for _ in range(calls)
+    ))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await monitor
+    await db.close()
+
+    lags.sort()
+    return {
+        'elapsed': elapsed,
+        'lag_p50': statistics.median(lags) if lags else 0.0,
+        'lag_p99': percentile(lags, 0.99) if lags else 0.0,
+        'lag_max': lags[-1] if lags else 0.0,
+        'samples': len(lags)
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description='Event-loop lag under concurrent /stats view calls')
+    parser.add_argument('--calls', type=int, default=100)
+    parser.add_argument('--members', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=0.05, help='Simulated PostgREST round trip in seconds')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--interval', type=float, default=0.005, help='Lag probe interval in seconds')
+    args = parser.parse_args()
+
+    print(f"{args.calls} concurrent /stats view calls, {args.latency * 1000:.0f} ms simulated latency, {args.members} members")
+    print(f"{'backend':<12}{'wall (s)':>10}{'samples':>9}{'lag p50 (ms)':>15}{'lag p99 (ms)':>15}{'lag max (ms)':>15}")
+
+    for name, backend_class in [
+        ('blocking', BlockingSupabaseBackend),
+        ('executor', SupabaseBackend)
+    ]:
+        client = FakeSupabase(latency=args.latency)
+        seed(client, args.members)
+        db = GameStatsDatabase(backend=backend_class(client, max_workers=args.workers))
+        result = await run(db, args.calls, args.members, args.interval)
+        print(
+            f"{name:<12}{result['elapsed']:>10.2f}{result['samples']:>9}{result['lag_p50'] * 1000:>15.1f}"
+            f"{result['lag_p99'] * 1000:>15.1f}{result['lag_max'] * 1000:>15.1f}"
+        )
+
+if __name__ == '__main__':
+    asyncio.run(main())
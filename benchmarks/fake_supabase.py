@@ -0,0 +1,364 @@
+import threading
+import time
+from collections import defaultdict
+
+from bot.stats import STAT_COUNTERS, DERIVED_STATS, SORT_COLUMNS, ratio
+from bot.database import default_profile
+
+OPERATORS = {
+    'eq': lambda a, b: str(a) == str(b),
+    'gt': lambda a, b: a is not None and a > b,
+    'lt': lambda a, b: a is not None and a < b,
+    'is': lambda a, b: a is None if b == 'null' else a is b,
+    'in': lambda a, b: str(a) in {str(value) for value in b}
+}
+
+def derive_game_stats(row):
+    for stat_name, (numerator, denominator) in DERIVED_STATS.items():
+        row[stat_name] = ratio(row.get(numerator, 0), row.get(denominator, 0))
+    for stat_name, rank_column in SORT_COLUMNS.items():
+        row[rank_column] = row.get(stat_name) or None
+    return row
+
+GENERATED_COLUMNS = {'game_stats': derive_game_stats}
+
+INDEXED_COLUMNS = ['user_id', 'game_name']
+
+class FakeResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+class FakeQuery:
+    def __init__(self, client, table_name):
+        self.client = client
+        self.table_name = table_name
+        self.action = 'select'
+        self.columns = None
+        self.payload = None
+        self.filters = []
+        self.orders = []
+        self.window = None
+        self.count = None
+        self.head = False
+        self.on_conflict = None
+        self.ignore_duplicates = False
+        self.negate = False
+
+    def select(self, *columns, count=None, head=None):
+        self.action = 'select'
+        self.count = count
+        self.head = bool(head)
+        columns = [c.strip() for column in columns for c in column.split(',')]
+        self.columns = None if columns in ([], ['*']) else columns
+        return self
+
+    def insert(self, rows):
+        self.action = 'insert'
+        self.payload = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def upsert(self, rows, on_conflict='', ignore_duplicates=False, **kwargs):
+        self.action = 'upsert'
+        self.payload = rows if isinstance(rows, list) else [rows]
+        self.on_conflict = [column.strip() for column in on_conflict.split(',') if column.strip()]
+        self.ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, values):
+        self.action = 'update'
+        self.payload = values
+        return self
+
+    def delete(self):
+        self.action = 'delete'
+        return self
+
+    def _filter(self, column, operator, value):
+        self.filters.append((column, operator, value, self.negate))
+        self.negate = False
+        return self
+
+    @property
+    def not_(self):
+        self.negate = True
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, 'eq', value)
+
+    def is_(self, column, value):
+        return self._filter(column, 'is', value)
+
+    def in_(self, column, values):
+        return self._filter(column, 'in', values)
+
+    def order(self, column, desc=False, nullsfirst=None):
+        self.orders.append((column, desc, desc if nullsfirst is None else nullsfirst))
+        return self
+
+    def range(self, start, end):
+        self.window = (start, end + 1)
+        return self
+
+    def limit(self, size):
+        self.window = (0, size)
+        return self
+
+    def gt(self, column, value):
+        return self._filter(column, 'gt', value)
+
+    def lt(self, column, value):
+        return self._filter(column, 'lt', value)
+
+    def matches(self, row):
+        return all(
+            OPERATORS[operator](row.get(column), value) != negate
+            for column, operator, value, negate in self.filters
+        )
+
+    def generate(self, row):
+        derive = GENERATED_COLUMNS.get(self.table_name)
+        return derive(row) if derive else row
+
+    def project(self, row):
+        if self.columns is None:
+            return dict(row)
+        return {column: row.get(column) for column in self.columns}
+
+    def execute(self):
+        if self.client.latency:
+            time.sleep(self.client.latency)
+
+        with self.client.lock:
+            rows = self.client.tables[self.table_name]
+
+            if self.action == 'select':
+                selected = [row for row in self.client.candidates(self.table_name, self.filters) if self.matches(row)]
+                count = len(selected) if self.count else None
+                if self.head:
+                    return FakeResponse([], count)
+                for column, desc, nullsfirst in reversed(self.orders):
+                    nulls = [row for row in selected if row.get(column) is None]
+                    selected = [row for row in selected if row.get(column) is not None]
+                    selected.sort(key=lambda row: row[column], reverse=desc)
+                    selected = nulls + selected if nullsfirst else selected + nulls
+                if self.window is not None:
+                    selected = selected[self.window[0]:self.window[1]]
+                return FakeResponse([self.project(row) for row in selected], count)
+
+            if self.action == 'upsert':
+                existing = {tuple(str(row.get(column)) for column in self.on_conflict): row for row in rows}
+                written = []
+                for payload in self.payload:
+                    key = tuple(str(payload.get(column)) for column in self.on_conflict)
+                    if key in existing:
+                        if self.ignore_duplicates:
+                            continue
+                        existing[key].update(payload)
+                        written.append(dict(self.generate(existing[key])))
+                    else:
+                        row = self.generate(dict(payload))
+                        rows.append(row)
+                        existing[key] = row
+                        written.append(dict(row))
+                return FakeResponse(written)
+
+            if self.action == 'insert':
+                inserted = [self.generate(dict(row)) for row in self.payload]
+                rows.extend(inserted)
+                return FakeResponse([dict(row) for row in inserted])
+
+            if self.action == 'update':
+                updated = []
+                for row in self.client.candidates(self.table_name, self.filters):
+                    if self.matches(row):
+                        row.update(self.payload)
+                        updated.append(dict(self.generate(row)))
+                return FakeResponse(updated)
+
+            deleted = [row for row in rows if self.matches(row)]
+            self.client.tables[self.table_name] = [row for row in rows if not self.matches(row)]
+            return FakeResponse(deleted)
+
+class FakeRpc:
+    def __init__(self, client, function_name, params):
+        self.client = client
+        self.function = client.functions[function_name]
+        self.params = params
+
+    def execute(self):
+        if self.client.latency:
+            time.sleep(self.client.latency)
+
+        with self.client.lock:
+            return FakeResponse(self.function(self.client, self.params))
+
+def increment_game_stats(client, params):
+    key = (str(params['p_server_id']), str(params['p_user_id']), params['p_game_name'])
+    for row in client.candidates('game_stats', [('user_id', 'eq', params['p_user_id'], False)]):
+        if (str(row['server_id']), str(row['user_id']), row['game_name']) == key:
+            break
+    else:
+        row = {'server_id': params['p_server_id'], 'user_id': params['p_user_id'], 'game_name': params['p_game_name']}
+        row.update({stat_name: 0 for stat_name in STAT_COUNTERS})
+        client.tables['game_stats'].append(row)
+
+    for stat_name in STAT_COUNTERS:
+        row[stat_name] += params.get(f'p_{stat_name}', 0)
+    return [dict(derive_game_stats(row))]
+
+def increment_game_stats_batch(client, params):
+    updated = []
+    for row in params['p_rows']:
+        increment = {'p_server_id': row['server_id'], 'p_user_id': row['user_id'], 'p_game_name': row['game_name']}
+        for stat_name in STAT_COUNTERS:
+            increment[f'p_{stat_name}'] = row.get(stat_name, 0)
+        updated.extend(increment_game_stats(client, increment))
+    return updated
+
+def ensure_row(client, table_name, row):
+    key = (str(row['server_id']), str(row['user_id']))
+    for existing in client.candidates(table_name, [('user_id', 'eq', row['user_id'], False)]):
+        if (str(existing['server_id']), str(existing['user_id'])) == key:
+            return [dict(existing)]
+    client.tables[table_name].append(row)
+    return [dict(row)]
+
+def ensure_user_profile(client, params):
+    profile = default_profile(params['p_server_id'], params['p_user_id'], params.get('p_display_name', ''))
+    return ensure_row(client, 'user_profiles', profile)
+
+def ensure_player_left(client, params):
+    return ensure_row(client, 'player_left', {column[2:]: value for column, value in params.items()})
+
+def user_rows(client, table_name, params):
+    key = (str(params['p_server_id']), str(params['p_user_id']))
+    return [
+        row for row in client.candidates(table_name, [('user_id', 'eq', params['p_user_id'], False)])
+        if (str(row['server_id']), str(row['user_id'])) == key
+    ]
+
+def remove_user_rows(client, table_name, params):
+    removed = user_rows(client, table_name, params)
+    if removed:
+        removed_ids = {id(row) for row in removed}
+        client.tables[table_name] = [row for row in client.tables[table_name] if id(row) not in removed_ids]
+    return removed
+
+def delete_all_user_data(client, params):
+    remove_user_rows(client, 'user_profiles', params)
+    remove_user_rows(client, 'player_left', params)
+    return [row['game_name'] for row in remove_user_rows(client, 'game_stats', params)]
+
+def reset_user_stats(client, params):
+    existing = {row['game_name']: row for row in user_rows(client, 'game_stats', params)}
+    reset = []
+    for game_name in params['p_games']:
+        row = existing.get(game_name)
+        if row is None:
+            row = {'server_id': params['p_server_id'], 'user_id': params['p_user_id'], 'game_name': game_name}
+            client.tables['game_stats'].append(row)
+        row.update({stat_name: 0 for stat_name in STAT_COUNTERS})
+        reset.append(dict(derive_game_stats(row)))
+    return reset
+
+def join_member(client, params):
+    remove_user_rows(client, 'player_left', params)
+    existing = {row['game_name'] for row in user_rows(client, 'game_stats', params)}
+    for game_name in params['p_games']:
+        if game_name not in existing:
+            row = {'server_id': params['p_server_id'], 'user_id': params['p_user_id'], 'game_name': game_name}
+            row.update({stat_name: 0 for stat_name in STAT_COUNTERS})
+            client.tables['game_stats'].append(derive_game_stats(row))
+
+    ensure_user_profile(client, params)
+    for row in user_rows(client, 'user_profiles', params):
+        row['display_name'] = params['p_display_name']
+    return [dict(row) for row in user_rows(client, 'game_stats', params) if row['game_name'] in params['p_games']]
+
+def set_display_names(client, params):
+    for member in params['p_members']:
+        for row in user_rows(client, 'user_profiles', {'p_server_id': params['p_server_id'], 'p_user_id': member['user_id']}):
+            row['display_name'] = member['display_name']
+    return None
+
+def init_members(client, params):
+    rows = []
+    for member in params['p_members']:
+        rows.extend(join_member(client, {
+            'p_server_id': member['server_id'],
+            'p_user_id': member['user_id'],
+            'p_display_name': member['display_name'],
+            'p_games': params['p_games']
+        }))
+    return rows
+
+def get_profile_card(client, params):
+    key = (str(params['p_server_id']), str(params['p_user_id']))
+    for profile in client.candidates('user_profiles', [('user_id', 'eq', params['p_user_id'], False)]):
+        if (str(profile['server_id']), str(profile['user_id'])) == key:
+            break
+    else:
+        profile = default_profile(params['p_server_id'], params['p_user_id'])
+        client.tables['user_profiles'].append(profile)
+
+    for stats in client.candidates('game_stats', [('user_id', 'eq', params['p_user_id'], False)]):
+        if (str(stats['server_id']), str(stats['user_id']), stats['game_name']) == key + (profile['main_game'],):
+            return {'profile': dict(profile), 'stats': dict(stats)}
+    return {'profile': dict(profile), 'stats': None}
+
+def claim_guild_bootstrap(client, params):
+    now = time.time()
+    for row in client.candidates('guild_bootstrap', [('server_id', 'eq', params['p_server_id'], False)]):
+        if str(row['server_id']) == str(params['p_server_id']):
+            if row['claimed_at'] >= now - params['p_stale_after_seconds']:
+                return False
+            break
+    else:
+        row = {'server_id': params['p_server_id']}
+        client.tables['guild_bootstrap'].append(row)
+
+    row.update({'shard_id': params['p_shard_id'], 'cluster_id': params['p_cluster_id'], 'members': None, 'claimed_at': now})
+    return True
+
+class FakeSupabase:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.tables = defaultdict(list)
+        self.lock = threading.Lock()
+        self.indexes = {}
+        self.functions = {
+            'increment_game_stats': increment_game_stats,
+            'increment_game_stats_batch': increment_game_stats_batch,
+            'claim_guild_bootstrap': claim_guild_bootstrap,
+            'get_profile_card': get_profile_card,
+            'ensure_user_profile': ensure_user_profile,
+            'ensure_player_left': ensure_player_left,
+            'delete_all_user_data': delete_all_user_data,
+            'reset_user_stats': reset_user_stats,
+            'init_members': init_members,
+            'set_display_names': set_display_names
+        }
+
+    def candidates(self, table_name, filters):
+        rows = self.tables[table_name]
+        equalities = {filter[0]: filter[2] for filter in filters if filter[1] == 'eq' and not filter[-1]}
+        column = next((column for column in INDEXED_COLUMNS if column in equalities), None)
+        if column is None:
+            return rows
+
+        cached = self.indexes.get((table_name, column))
+        if cached is None or cached[0] is not rows or cached[1] != len(rows):
+            by_value = defaultdict(list)
+            for row in rows:
+                by_value[str(row.get(column))].append(row)
+            cached = (rows, len(rows), by_value)
+            self.indexes[(table_name, column)] = cached
+        return cached[2].get(str(equalities[column]), [])
+
+    def table(self, table_name):
+        return FakeQuery(self, table_name)
+
+    def rpc(self, function_name, params):
+        return FakeRpc(self, function_name, params)
@@ -0,0 +1,199 @@
+import argparse
+import asyncio
+import json
+import math
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from bot.database import GameStatsDatabase, default_profile
+from bot.stats import STAT_COUNTERS, STAT_NAMES
+from bot.leaderboard_views import LeaderboardView
+from bot.edit_profile_views import ProfileEditView
+from benchmarks.fake_supabase import FakeSupabase, derive_game_stats
+
+GUILD_ID = 1406313376279298088
+GAMES = ['r6s', 'bf6']
+
+class FakeGuild:
+    def __init__(self, members):
+        self.id = GUILD_ID
+        self.members = members
+
+    def get_member(self, user_id):
+        return self.members.get(user_id)
+
+class FakeBot:
+    def __init__(self, guild):
+        self.guild = guild
+
+    def get_guild(self, guild_id):
+        return self.guild if guild_id == self.guild.id else None
+
+    def get_user(self, user_id):
+        return None
+
+def seed(client, members):
+    for user_id in range(1, members + 1):
+        client.tables['user_profiles'].append(default_profile(GUILD_ID, user_id))
+        for game in GAMES:
+            row = {'server_id': GUILD_ID, 'user_id': user_id, 'game_name': game}
+            for stat_name in STAT_COUNTERS:
+                row[stat_name] = random.choice([0, random.randint(1, 5000)])
+            client.tables['game_stats'].append(derive_game_stats(row))
+
+def percentile(samples, fraction):
+    # Nearest-rank: the smallest sample with at least `fraction` of samples at or below it.
+    return samples[max(0, math.ceil(len(samples) * fraction) - 1)]
+
+async def measure(operation, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await operation()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+
+    tracemalloc.start()
+    peaks = []
+    before = tracemalloc.take_snapshot()
+    for _ in range(iterations):
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        await operation()
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    # Net growth in live blocks across the run: what the call leaves behind, not what it allocates.
+    retained = sum(stat.count_diff for stat in after.compare_to(before, 'filename') if stat.count_diff > 0)
+    return {
+        'p50': statistics.median(timings),
+        'p99': percentile(timings, 0.99),
+        'peak_kib': statistics.median(peaks) / 1024,
+        'retained_blocks': retained / iterations
+    }
+
+def compare(baseline, size, results, threshold):
+    regressions = []
+    recorded = baseline.get(str(size), {})
+    for name, result in results:
+        previous = recorded.get(name)
+        if previous is None:
+            continue
+        # Retained blocks swing with cache fill and GC timing, so they are reported but not gated.
+        for metric in ('p50', 'peak_kib'):
+            # Ignore near-zero baselines where any noise reads as a large ratio.
+            if previous[metric] > 1e-6 and result[metric] > previous[metric] * threshold:
+                regressions.append(f"{size:,} members {name} {metric}: {previous[metric]:.4g} -> {result[metric]:.4g}")
+    return regressions
+
+async def run(members, args):
+    random.seed(args.seed)
+    client = FakeSupabase(latency=args.latency)
+    seed(client, members)
+    db = GameStatsDatabase(client=client, max_workers=args.workers, leaderboard_index=not args.no_index)
+    if db.leaderboard_index is not None:
+        db.leaderboard_index.min_rows = args.index_min_rows
+
+    guild = FakeGuild({
+        user_id: SimpleNamespace(id=user_id, display_name=f'Player {user_id}')
+        for user_id in range(1, members + 1)
+    })
+    bot = FakeBot(guild)
+    interaction = SimpleNamespace(guild_id=GUILD_ID, guild=guild)
+
+    def random_user():
+        return random.randint(1, members)
+
+    async def get_stats():
+        await db.get_stats(GUILD_ID, random_user(), random.choice(GAMES))
+
+    async def insert_or_update_stat():
+        await db.insert_or_update_stat(GUILD_ID, random_user(), random.choice(GAMES), kills=1, deaths=1)
+
+    view = LeaderboardView(db, bot, 'r6s', 'kills', GUILD_ID)
+    max_page = max(1, members // view.players_per_page)
+
+    async def setup_pages():
+        view.stat = random.choice(STAT_NAMES)
+        view.current_page = random.randrange(max_page)
+        await view.setup_pages()
+
+    async def create_leaderboard_container():
+        view.create_leaderboard_container(view.page_text)
+
+    async def refresh_content():
+        await ProfileEditView(db, random_user()).refresh_content(interaction)
+
+    start = time.perf_counter()
+    for game in GAMES:
+        await db.get_leaderboard_page(GUILD_ID, game, 'kills')
+    warmup = time.perf_counter() - start
+
+    results = []
+    for name, operation in [
+        ('get_stats', get_stats),
+        ('insert_or_update_stat', insert_or_update_stat),
+        ('LeaderboardView.setup_pages', setup_pages),
+        ('create_leaderboard_container', create_leaderboard_container),
+        ('ProfileEditView.refresh_content', refresh_content)
+    ]:
+        results.append((name, await measure(operation, args.iterations)))
+
+    await db.close()
+    return warmup, results
+
+async def main():
+    parser = argparse.ArgumentParser(description='Latency and allocation profile of the database and view hot paths')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000], help='Synthetic guild sizes in members')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.0, help='Simulated PostgREST round trip in seconds')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--no-index', action='store_true', help='Serve leaderboards from ranked queries instead of the in-process index')
+    parser.add_argument('--index-min-rows', type=int, default=0, help='Guild/game row count below which the index falls back to ranked queries')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save-baseline', metavar='PATH', help='Write the results as JSON for later --baseline runs')
+    parser.add_argument('--baseline', metavar='PATH', help='Compare against a saved run and exit non-zero on regressions')
+    parser.add_argument('--threshold', type=float, default=1.25, help='Ratio over the baseline that counts as a regression')
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('seed') != args.seed or baseline.get('iterations') != args.iterations:
+            print("Warning: baseline was recorded with a different --seed or --iterations")
+
+    saved = {'seed': args.seed, 'iterations': args.iterations, 'latency': args.latency}
+    regressions = []
+    for members in args.sizes:
+        warmup, results = await run(members, args)
+        print(f"\n{members:,} members, {args.latency * 1000:.0f} ms simulated latency, {args.iterations} iterations (warmup {warmup:.2f}s)")
+        print(f"{'operation':<34}{'p50 (ms)':>10}{'p99 (ms)':>10}{'peak (KiB)':>12}{'retained blocks/call':>22}")
+        for name, result in results:
+            print(
+                f"{name:<34}{result['p50'] * 1000:>10.2f}{result['p99'] * 1000:>10.2f}"
+                f"{result['peak_kib']:>12.1f}{result['retained_blocks']:>22.1f}"
+            )
+        saved[str(members)] = dict(results)
+        if baseline is not None:
+            regressions += compare(baseline, members, results, args.threshold)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(saved, f, indent=2)
+
+    if baseline is not None:
+        if regressions:
+            print(f"\nRegressions over {args.threshold:.2f}x baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\nNo regressions against baseline")
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -1,4 +1,8 @@
-from discord.ext import commands
+import discord
+from discord.ext import commands, tasks
+import asyncio
+import os
+import time
 
 game_list = ['r6s', 'bf6']
 
@@ -6,54 +10,164 @@ class DatabaseInitializationCog(commands.Cog):
     def __init__(self, bot) -> None:
         self.bot = bot
         self.db = bot.db
+        self.bootstrap_stale_after = float(os.getenv('BOOTSTRAP_STALE_MINUTES', '30')) * 60
+        if self.db.leaderboard_index is not None:
+            self.verify_leaderboard_index.start()
         print(f"DatabaseInitializationCog loaded")
 
+    def cog_unload(self):
+        self.verify_leaderboard_index.cancel()
+
+    @tasks.loop(minutes=30)
+    async def verify_leaderboard_index(self):
+        for server_id, game_name in self.db.leaderboard_index.loaded_keys():
+            try:
+                await self.db.leaderboard_index.verify(server_id, game_name)
+            except Exception as e:
+                print(f"Error verifying leaderboard index for guild {server_id} ({game_name}): {e}")
+
+    @verify_leaderboard_index.before_loop
+    async def before_verify_leaderboard_index(self):
+        await self.bot.wait_until_ready()
+
+    @commands.command(name='dbstats', description='Show database cache statistics', hidden=True)
+    @commands.is_owner()
+    async def dbstats(self, ctx) -> None:
+        embed = discord.Embed(
+            title='🗄️ Database Cache Statistics',
+            description='Read-through cache counters since startup',
+            color=0x00d4ff
+        )
+        for name, stats in self.db.cache_stats().items():
+            embed.add_field(
+                name=f'📦 {name.capitalize()}',
+                value=(
+                    f"**Hits:** `{stats['hits']:,}`\n"
+                    f"**Misses:** `{stats['misses']:,}`\n"
+                    f"**Hit Rate:** `{stats['hit_rate']:.1%}`\n"
+                    f"**Entries:** `{stats['size']:,}`"
+                ),
+                inline=True
+            )
+        coalescing = self.db.coalescing_stats()
+        embed.add_field(
+            name='🔀 Coalesced Reads',
+            value=(
+                f"**Calls:** `{coalescing['calls']:,}`\n"
+                f"**Deduplicated:** `{coalescing['deduplicated']:,}`\n"
+                f"**Dedup Rate:** `{coalescing['dedup_rate']:.1%}`\n"
+                f"**In Flight:** `{coalescing['inflight']:,}`"
+            ),
+            inline=True
+        )
+        write_queue = self.db.write_queue_stats()
+        if write_queue is not None:
+            embed.add_field(
+                name='📝 Write-Behind Queue',
+                value=(
+                    f"**Pending:** `{write_queue['pending']:,}`\n"
+                    f"**Merged:** `{write_queue['merged']:,}` of `{write_queue['queued']:,}`\n"
+                    f"**Flushes:** `{write_queue['flushes']:,}` (`{write_queue['flushed_rows']:,}` rows)\n"
+                    f"**Last Flush:** `{write_queue['last_flush_ms']:.1f} ms`"
+                ),
+                inline=True
+            )
+        lifecycle = self.db.member_lifecycle_stats()
+        embed.add_field(
+            name='👥 Member Lifecycle',
+            value=(
+                f"**Queue Depth:** `{lifecycle['queue_depth']:,}` of `{lifecycle['queue_capacity']:,}` (`{lifecycle['pending']:,}` pending)\n"
+                f"**Coalesced:** `{lifecycle['coalesced']:,}` of `{lifecycle['received']:,}`\n"
+                f"**Flushed:** `{lifecycle['flushed_joins']:,}` joins, `{lifecycle['flushed_leaves']:,}` leaves in `{lifecycle['flushes']:,}` flushes\n"
+                f"**Flush Latency:** `{lifecycle['last_flush_ms']:.1f} ms` (max `{lifecycle['max_flush_ms']:.1f} ms`)"
+            ),
+            inline=True
+        )
+        for command, timing in self.bot.response_timings.stats().items():
+            embed.add_field(
+                name=f'⏱️ /{command}',
+                value=(
+                    f"**Calls:** `{timing['count']:,}`\n"
+                    f"**Ack p50/p95:** `{timing['ack_p50_ms']:.0f}/{timing['ack_p95_ms']:.0f} ms`\n"
+                    f"**Fulfil p50/p95:** `{timing['fulfil_p50_ms']:.0f}/{timing['fulfil_p95_ms']:.0f} ms`"
+                ),
+                inline=True
+            )
+        embed.set_footer(text='🔐 Owner Only Tool')
+        await ctx.send(embed=embed)
+
+    async def guild_members(self, guild):
+        if guild.chunked:
+            return guild.members
+        return await guild.chunk(cache=False)
+
+    async def bootstrap_guild(self, guild):
+        server_id = guild.id
+        display_names = {member.id: member.display_name for member in await self.guild_members(guild) if not member.bot}
+        member_ids = set(display_names)
+
+        stored_names, existing_stats = await asyncio.gather(
+            self.db.get_profile_display_names(server_id),
+            self.db.get_stat_keys(server_id, game_list)
+        )
+
+        missing_profiles = member_ids - set(stored_names)
+        missing_stats = {(user_id, game) for user_id in member_ids for game in game_list} - existing_stats
+        # Existing profiles only learn a member's name here; under the lean profile most
+        # members are never cached, so leaderboards read it from user_profiles.
+        renamed = {
+            user_id: display_names[user_id]
+            for user_id in member_ids & set(stored_names)
+            if stored_names[user_id] != display_names[user_id]
+        }
+
+        profiles_created = await self.db.bulk_create_user_profiles(server_id, missing_profiles, display_names=display_names)
+        names_updated = await self.db.bulk_set_display_names(server_id, renamed)
+        stats_created = await self.db.bulk_create_stats(server_id, missing_stats)
+
+        return len(member_ids), profiles_created, names_updated, stats_created
+
     @commands.Cog.listener()
-    async def on_ready(self):
-        print("Starting database initialization for all existing users...")
-        
+    async def on_shard_ready(self, shard_id):
+        print(f"Starting database initialization for existing users on shard {shard_id}...")
+        total_start = time.perf_counter()
+        skipped = 0
+
         for guild in self.bot.guilds:
+            if guild.shard_id != shard_id:
+                continue
+
+            try:
+                claimed = await self.db.claim_guild_bootstrap(guild.id, shard_id, self.bot.cluster_id, self.bootstrap_stale_after)
+            except Exception as e:
+                print(f"Error claiming database initialization for guild {guild.name}: {e}")
+                continue
+            if not claimed:
+                skipped += 1
+                continue
+
             print(f"Initializing database for guild: {guild.name} (ID: {guild.id})")
-            
-            for member in guild.members:
-                if member.bot:
-                    continue
-                
-                try:
-                    existing_profile = await self.db.get_user_profile(str(guild.id), str(member.id))
-                    
-                    if not existing_profile:
-                        await self.db.create_user_profile(str(guild.id), str(member.id))
-                        print(f"Created profile for {member.name} in {guild.name}")
-                    else:
-                        print(f"Profile already exists for {member.name} in {guild.name}")
-                    
-                    for game in game_list:
-                        existing_stats = await self.db.get_stats(str(guild.id), str(member.id), game)
-                        
-                        if not existing_stats:
-                            await self.db.insert_or_update_stat(
-                                str(guild.id),
-                                str(member.id),
-                                game,
-                                tournaments_played=0,
-                                tournaments_won=0,
-                                earnings=0,
-                                kills=0,
-                                deaths=0,
-                                wins=0,
-                                losses=0
-                            )
-                            print(f"Created {game} stats for {member.name} in {guild.name}")
-                        else:
-                            print(f"{game} stats already exist for {member.name} in {guild.name}")
-                    
-                except Exception as e:
-                    print(f"Error initializing database for {member.name} in {guild.name}: {e}")
-            
-            print(f"Completed database initialization for guild: {guild.name}")
-        
-        print("Database initialization completed for all existing users")
+            start = time.perf_counter()
+
+            try:
+                members, profiles_created, names_updated, stats_created = await self.bootstrap_guild(guild)
+            except Exception as e:
+                print(f"Error initializing database for guild {guild.name}: {e}")
+                await self.db.release_guild_bootstrap(guild.id)
+                continue
+            await self.db.finish_guild_bootstrap(guild.id, members)
+
+            elapsed = time.perf_counter() - start
+            print(
+                f"Completed database initialization for guild: {guild.name} in {elapsed:.2f}s "
+                f"({members} members, {profiles_created} profiles and {stats_created} stat rows created, "
+                f"{names_updated} display names updated)"
+            )
+
+        print(
+            f"Database initialization completed for shard {shard_id} in {time.perf_counter() - total_start:.2f}s "
+            f"({skipped} guilds recently initialized elsewhere)"
+        )
 
 async def setup(bot) -> None:
-    await bot.add_cog(DatabaseInitializationCog(bot))
\ No newline at end of file
+    await bot.add_cog(DatabaseInitializationCog(bot))
@@ -7,26 +7,20 @@ import json
 from ..database import GameStatsDatabase
 from ..edit_stats_views import SelectUserView
 from ..edit_profile_views import ProfileEditView
-from ..leaderboard_views import LeaderboardPaginator
+from ..leaderboard_views import LeaderboardPaginator, LeaderboardButton, LeaderboardGameSelect, STAT_DISPLAY_MAP, format_stat_value, get_medal_emoji
 
 game_list = ['r6s', 'bf6']
 
 async def user_autocomplete(interaction: Interaction, current: str):
 	try:
 		db = interaction.client.db
-		players_left = await db.get_server_players_left(interaction.guild_id)
+		players_left = await db.search_players_left(interaction.guild_id, current, limit=25)
 
 		choices = []
 		for user_id, user_name, display_name in players_left:
-			search_text = f"{user_name} {display_name}".lower()
-
-			if current.lower() in search_text:
-				label = f"{display_name} ({user_name})" if user_name != display_name else user_name
-				value = f"{user_id}:{label}"
-				choices.append(app_commands.Choice(name=label[:100], value=value[:100]))
-
-			if len(choices) >= 25:
-				break
+			label = f"{display_name} ({user_name})" if user_name != display_name else user_name
+			value = f"{user_id}:{label}"
+			choices.append(app_commands.Choice(name=label[:100], value=value[:100]))
 
 		return choices
 	except Exception as e:
@@ -37,6 +31,7 @@ class Commands(commands.Cog):
 	def __init__(self, bot) -> None:
 		self.bot = bot
 		self.db = bot.db
+		self.timings = bot.response_timings
 		self.game_display_names = {'r6s': 'Rainbow Six Siege', 'bf6': 'Battlefield 6'}
 		print(f"Commands loaded")
 
@@ -71,17 +66,75 @@ class Commands(commands.Cog):
 		stat='The stat to show the leaderboard for'
 	)
 	async def leaderboard(self, i: Interaction, game: str, stat: str):
+		timer = self.timings.start('stats leaderboard')
+		await timer.defer(i)
 		paginator = LeaderboardPaginator(
 			self.db,
 			self.bot,
 			game,
 			stat,
 			i.guild_id,
-			author_id=i.user.id,
-			timeout=300
+			author_id=i.user.id
 		)
 
 		await paginator.start(i)
+		timer.finish()
+
+	@stats.command(
+		name='rank',
+		description='Shows where a user ranks on a leaderboard'
+	)
+	@app_commands.choices(
+		game=[
+			Choice(name='Rainbow Six Siege', value='r6s'),
+			Choice(name='Battlefield 6', value='bf6')
+		],
+		stat=[
+			Choice(name='Kills', value='kills'),
+			Choice(name='Deaths', value='deaths'),
+			Choice(name='K/D Ratio', value='kd'),
+			Choice(name='Wins', value='wins'),
+			Choice(name='Losses', value='losses'),
+			Choice(name='W/L Ratio', value='wl'),
+			Choice(name='Earnings', value='earnings'),
+			Choice(name='Tournaments Played', value='tournaments_played'),
+			Choice(name='Tournaments Won', value='tournaments_won')
+		]
+	)
+	@app_commands.describe(
+		game='The game to look up the rank for',
+		stat='The stat to rank by',
+		user='The user to show the rank for(defaults to yourself)'
+	)
+	async def rank(self, i: Interaction, game: str, stat: str, user: Optional[discord.Member] = None) -> None:
+		timer = self.timings.start('stats rank')
+		await timer.defer(i)
+		target_user = user if user else i.user
+		rank = await self.db.get_user_rank(i.guild_id, game, stat, target_user.id)
+
+		game_name = self.game_display_names.get(game, game)
+		stat_name = STAT_DISPLAY_MAP.get(stat, stat)
+
+		container = discord.ui.Container(accent_color=0x00d4ff)
+		container.add_item(discord.ui.TextDisplay(f"# 🏆 Leaderboard Rank: {game_name}\n🎯 **Player:** {target_user.mention}"))
+		container.add_item(discord.ui.Separator(spacing=discord.SeparatorSpacing.large))
+
+		if rank is None:
+			container.add_item(discord.ui.TextDisplay(f"## ❌ Not Ranked\n-# No {stat_name} recorded for this player in {game_name}"))
+		else:
+			position, total_players, value = rank
+			container.add_item(discord.ui.TextDisplay(
+				f"## {get_medal_emoji(position)} Rank {position:,} of {total_players:,}\n"
+				f"{stat_name}: {format_stat_value(stat, value)}"
+			))
+
+		container.add_item(discord.ui.Separator(spacing=discord.SeparatorSpacing.small))
+		container.add_item(discord.ui.TextDisplay("-# 🎮 Leaderboard • Updated in real-time"))
+
+		view = discord.ui.LayoutView()
+		view.add_item(container)
+		await i.followup.send(view=view)
+		timer.finish()
 
 	@stats.command(
 		name='profile',
@@ -91,11 +144,10 @@ class Commands(commands.Cog):
 		user='The user to show the profile for(defaults to yourself)'
 	)
 	async def profile(self, i: Interaction, user: Optional[discord.Member]) -> None:
+		timer = self.timings.start('stats profile')
+		await timer.defer(i)
 		target_user = user if user else i.user
-		profile = await self.db.get_user_profile(str(i.guild_id), str(target_user.id))
-		if not profile:
-			await self.db.create_user_profile(str(i.guild_id), str(target_user.id))
-			profile = await self.db.get_user_profile(str(i.guild_id), str(target_user.id))
+		profile, stats = await self.db.get_profile_card(i.guild_id, target_user.id)
 
 		if len(profile) == 6:
 			gaming_bio, main_game, social_links_str, embed_color, timezone, team_affiliation = profile
@@ -153,7 +205,7 @@ class Commands(commands.Cog):
 				inline=False
 			)
 
-		if stats := await self.db.get_stats(i.guild_id, target_user.id, main_game, stat=None) if main_game else None:
+		if stats:
 			tournaments_played, tournaments_won, earnings, kills, deaths, kd, wins, losses, wl = stats
 
 			stats_text = (
@@ -214,7 +266,7 @@ class Commands(commands.Cog):
 
 			container.add_item(discord.ui.TextDisplay(social_text))
 
-		if stats := await self.db.get_stats(i.guild_id, target_user.id, main_game, stat=None) if main_game else None:
+		if stats:
 			tournaments_played, tournaments_won, earnings, kills, deaths, kd, wins, losses, wl = stats
 
 			container.add_item(discord.ui.Separator(spacing=discord.SeparatorSpacing.large))
@@ -239,7 +291,8 @@ class Commands(commands.Cog):
 
 		view = discord.ui.LayoutView()
 		view.add_item(container)
-		await i.response.send_message(view=view)
+		await i.followup.send(view=view)
+		timer.finish()
 
 	@stats.command(
 		name='view',
@@ -255,6 +308,8 @@ class Commands(commands.Cog):
 		user='The user to show the stats for(defaults to yourself)'
 	)
 	async def view(self, i: Interaction, user: Optional[discord.Member], game: Optional[str] = None) -> None:
+		timer = self.timings.start('stats view')
+		await timer.defer(i)
 		target_user = user if user else i.user
 		stats = await self.db.get_stats(i.guild_id, target_user.id, game, stat=None)
 
@@ -264,21 +319,13 @@ class Commands(commands.Cog):
 		container.add_item(discord.ui.TextDisplay(header_text))
 		container.add_item(discord.ui.Separator(spacing=discord.SeparatorSpacing.large))
 
-		if stats is None or (isinstance(stats, list) and len(stats) == 0):
+		if not stats:
 			container.add_item(discord.ui.TextDisplay("## ❌ No Statistics Found"))
 			no_stats_text = f"This player has no gaming statistics recorded yet.\n\n💡 *Start playing tournaments to build your stats!*"
 			container.add_item(discord.ui.TextDisplay(no_stats_text))
 		else:
-			if game is not None and isinstance(stats, list) and len(stats) == 9:
-				tournaments_played = stats[0]
-				tournaments_won = stats[1]
-				earnings = stats[2]
-				kills = stats[3]
-				deaths = stats[4]
-				kd = stats[5]
-				wins = stats[6]
-				losses = stats[7]
-				wl = stats[8]
+			if game is not None:
+				tournaments_played, tournaments_won, earnings, kills, deaths, kd, wins, losses, wl = stats
 
 				game_name = self.game_display_names.get(game, game)
 
@@ -298,21 +345,12 @@ class Commands(commands.Cog):
 
 				container.add_item(discord.ui.TextDisplay(stats_text))
 			else:
-				for idx, game_stats in enumerate(stats):
+				for idx, (game_code, game_stats) in enumerate(stats.items()):
 					if idx > 0:
 						container.add_item(discord.ui.Separator(spacing=discord.SeparatorSpacing.large))
 
-					game_code = game_stats[0]
 					game_name = self.game_display_names.get(game_code, game_code)
-					tournaments_played = game_stats[1]
-					tournaments_won = game_stats[2]
-					earnings = game_stats[3]
-					kills = game_stats[4]
-					deaths = game_stats[5]
-					kd = game_stats[6]
-					wins = game_stats[7]
-					losses = game_stats[8]
-					wl = game_stats[9]
+					tournaments_played, tournaments_won, earnings, kills, deaths, kd, wins, losses, wl = game_stats
 
 					container.add_item(discord.ui.TextDisplay(f"## 🎮 {game_name}"))
 
@@ -335,7 +373,8 @@ class Commands(commands.Cog):
 
 		view = discord.ui.LayoutView()
 		view.add_item(container)
-		await i.response.send_message(view=view)
+		await i.followup.send(view=view)
+		timer.finish()
 
 	set = app_commands.Group(
 		name='set',
@@ -348,14 +387,14 @@ class Commands(commands.Cog):
 		description='Set your profile descriptions'
 	)
 	async def set_profile(self, i: Interaction) -> None:
-		profile = await self.db.get_user_profile(str(i.guild_id), str(i.user.id))
-		if not profile:
-			await self.db.create_user_profile(str(i.guild_id), str(i.user.id))
+		timer = self.timings.start('stats set profile')
+		await timer.defer(i, ephemeral=True)
 
 		view = ProfileEditView(self.db, i.user.id)
 		await view.refresh_content(i)
 
-		await i.response.send_message(view=view, ephemeral=True)
+		await i.followup.send(view=view, ephemeral=True)
+		timer.finish()
 
 	admin = app_commands.Group(
 		name='admin',
@@ -388,44 +427,16 @@ class Commands(commands.Cog):
 		]
 	)
 	async def reset_stats(self, i: Interaction, user: discord.Member, game: Optional[str] = None) -> None:
+		await self.db.reset_user_stats(i.guild_id, user.id, game_list if game is None else [game])
 		if game is None:
-			for game in game_list:
-				await self.db.insert_or_update_stat(
-					str(i.guild_id),
-					str(user.id),
-					game,
-					tournaments_played=0,
-					tournaments_won=0,
-					earnings=0,
-					kills=0,
-					deaths=0,
-					kd=0.0,
-					wins=0,
-					losses=0,
-					wl=0.0
-				)
-				embed = discord.Embed(
-					title="🛠️ Admin Stats Reset",
-					description=f"🎯 **User:** {user.mention}\n\n✅ **Stats Reset Successful**\n\n📋 All gaming statistics for this user have been reset to zero.",
+			embed = discord.Embed(
+				title="🛠️ Admin Stats Reset",
+				description=f"🎯 **User:** {user.mention}\n\n✅ **Stats Reset Successful**\n\n📋 All gaming statistics for this user have been reset to zero.",
 				color=0x00ff00
-		)
-				embed.set_footer(text="🔐 Admin Only Tool • Secure Stats Management")
-				await i.response.send_message(embed=embed, ephemeral=True)
-		else:
-			await self.db.insert_or_update_stat(
-				str(i.guild_id),
-				str(user.id),
-				game,
-				tournaments_played=0,
-				tournaments_won=0,
-				earnings=0,
-				kills=0,
-				deaths=0,
-				kd=0.0,
-				wins=0,
-				losses=0,
-				wl=0.0
 			)
+			embed.set_footer(text="🔐 Admin Only Tool • Secure Stats Management")
+			await i.response.send_message(embed=embed, ephemeral=True)
+		else:
 			embed = discord.Embed(
 				title="🛠️ Admin Stats Reset",
 				description=f"🎯 **User:** {user.mention}\n\n✅ **Stats Reset Successful**\n\n📋 All gaming statistics for this user have been reset to zero for {self.game_display_names.get(game, game)}",
@@ -456,10 +467,7 @@ class Commands(commands.Cog):
 			await i.response.send_message(embed=embed, ephemeral=True)
 			return
 
-		await self.db.delete_user_profile(str(i.guild_id), str(user_id))
-		for game in game_list:
-			await self.db.delete_stats(str(i.guild_id), str(user_id), game)
-		await self.db.delete_player_left(str(i.guild_id), str(user_id))
+		await self.db.delete_all_user_data(i.guild_id, user_id)
 
 		embed = discord.Embed(
 			title="🗑️ User Data Deleted",
@@ -473,35 +481,25 @@ class Commands(commands.Cog):
 	async def on_member_join(self, member: discord.Member) -> None:
 		if member.bot:
 			return
-		player = await self.db.get_player_left(str(member.guild.id), str(member.id))
-		if player:
-			await self.db.delete_player_left(str(member.guild.id), str(member.id))
-			print(f"Deleted player left record for {member.name} in {member.guild.name}")
+		await self.db.member_lifecycle.join(member.guild.id, member.id, member.display_name, game_list)
+
+	@commands.Cog.listener()
+	async def on_member_update(self, before: discord.Member, after: discord.Member) -> None:
+		# Only fires for cached members. Under the lean profile an uncached member's first
+		# update caches them without dispatching, so that one rename is missed and the stored
+		# display name catches up on their next update.
+		if after.bot or before.display_name == after.display_name:
 			return
-		for game in game_list:
-			await self.db.insert_or_update_stat(
-				str(member.guild.id),
-				str(member.id),
-				game,
-				tournaments_played=0,
-				tournaments_won=0,
-				earnings=0,
-				kills=0,
-				deaths=0,
-				kd=0.0,
-				wins=0,
-				losses=0,
-				wl=0.0
-			)
-			print(f"Initialized stats for {member.name} in {member.guild.name} for {game}")
-		await self.db.create_user_profile(str(member.guild.id), str(member.id))
-		print(f"Initialized profile for {member.name} in {member.guild.name}")
+		await self.db.set_display_name(after.guild.id, after.id, after.display_name)
 
 	@commands.Cog.listener()
-	async def on_member_remove(self, member: discord.Member) -> None:
-		if member.bot:
+	async def on_raw_member_remove(self, payload: discord.RawMemberRemoveEvent) -> None:
+		# The raw event fires whether or not the member was cached; payload.user is the
+		# cached Member when there was one and a bare User otherwise.
+		if payload.user.bot:
 			return
-		await self.db.player_left(str(member.guild.id), str(member.id), member.name, member.display_name)
+		await self.db.member_lifecycle.leave(payload.guild_id, payload.user.id, payload.user.name, payload.user.display_name)
 
 async def setup(bot) -> None:
+	bot.add_dynamic_items(LeaderboardButton, LeaderboardGameSelect)
 	await bot.add_cog(Commands(bot))
\ No newline at end of file
@@ -1,213 +1,719 @@
 
-from supabase import create_client, Client
+import asyncio
+import contextlib
 import os
 import json
+from bot.stats import STAT_COUNTERS, STAT_NAMES, StatRecord, StatTable
+from bot.storage import BULK_CHUNK_SIZE, SELECT_PAGE_SIZE
+from bot.supabase_backend import SupabaseBackend
+from bot.sqlite_backend import SQLiteBackend
+from bot.leaderboard_index import LeaderboardIndex
+from bot.player_search import PlayerSearchIndex
+from bot.db_cache import TTLCache, SingleFlight, MISSING
+from bot.write_behind import StatWriteQueue
+from bot.member_lifecycle import MemberLifecyclePipeline
+
+def snowflake(value):
+    return None if value is None else int(value)
+
+def default_profile(server_id, user_id, display_name=''):
+    return {
+        'server_id': server_id,
+        'user_id': user_id,
+        'display_name': display_name,
+        'gaming_bio': '',
+        'main_game': 'r6s',
+        'social_links': '{}',
+        'embed_color': '0x00d4ff',
+        'timezone': 'UTC',
+        'team_affiliation': '',
+        'bf6_favorite_class': '',
+        'r6s_role': '',
+        'r6s_favorite_operator': ''
+    }
+
+PROFILE_COLUMNS = ['gaming_bio', 'main_game', 'social_links', 'embed_color', 'timezone', 'team_affiliation', 'bf6_favorite_class', 'r6s_role', 'r6s_favorite_operator']
+
+def profile_from_row(row):
+    defaults = default_profile(None, None)
+    return tuple(row.get(column, defaults[column]) for column in PROFILE_COLUMNS)
+
+def default_stats(server_id, user_id, game_name):
+    stats = {'server_id': server_id, 'user_id': user_id, 'game_name': game_name}
+    stats.update({stat_name: 0 for stat_name in STAT_COUNTERS})
+    return stats
+
+def create_backend(client=None, max_workers=None):
+    max_workers = max_workers or int(os.getenv('DB_MAX_WORKERS', '8'))
+    if client is not None:
+        return SupabaseBackend(client, max_workers=max_workers)
+
+    backend = os.getenv('STORAGE_BACKEND', 'supabase')
+    if backend == 'supabase':
+        return SupabaseBackend(max_workers=max_workers)
+    if backend == 'sqlite':
+        return SQLiteBackend(os.getenv('SQLITE_PATH', 'gamestats.db'), max_workers=max_workers)
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend}")
 
 class GameStatsDatabase:
-    def __init__(self):
-        supabase_url = os.getenv('SUPABASE_URL')
-        supabase_key = os.getenv('SUPABASE_ANON_KEY')
-        
-        if not supabase_url or not supabase_key:
-            raise ValueError("SUPABASE_URL and SUPABASE_ANON_KEY environment variables must be set")
-        
-        self.supabase: Client = create_client(supabase_url, supabase_key)
+    def __init__(self, client=None, max_workers=None, leaderboard_index=None, cache_size=None, cache_ttl=None, write_behind=None, backend=None):
+        self.backend = backend or create_backend(client, max_workers)
+
+        if leaderboard_index is None:
+            leaderboard_index = os.getenv('LEADERBOARD_INDEX', '1') == '1'
+        self.leaderboard_index = LeaderboardIndex(
+            self,
+            max_keys=int(os.getenv('LEADERBOARD_INDEX_MAX_KEYS', '4')),
+            min_rows=int(os.getenv('LEADERBOARD_INDEX_MIN_ROWS', '10000'))
+        ) if leaderboard_index else None
+        self.player_search = PlayerSearchIndex()
+        self.player_search_locks = {}
+
+        cache_size = cache_size or int(os.getenv('DB_CACHE_SIZE', '4096'))
+        cache_ttl = cache_ttl or float(os.getenv('DB_CACHE_TTL', '60'))
+        self.profile_cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self.stats_cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self.page_cache = TTLCache(maxsize=cache_size, ttl=float(os.getenv('LEADERBOARD_PAGE_TTL', '30')))
+        self.total_cache = TTLCache(maxsize=cache_size, ttl=float(os.getenv('LEADERBOARD_PAGE_TTL', '30')))
+        self.stat_versions = {}
+        self.single_flight = SingleFlight()
+        self.bootstrap_claims = {}
+
+        if write_behind is None:
+            write_behind = os.getenv('STATS_WRITE_BEHIND', '0') == '1'
+        self.write_queue = StatWriteQueue(
+            self,
+            flush_interval=float(os.getenv('STATS_FLUSH_INTERVAL', '0.5')),
+            max_pending=int(os.getenv('STATS_FLUSH_SIZE', '200'))
+        ) if write_behind else None
+
+        self.member_lifecycle = MemberLifecyclePipeline(
+            self,
+            flush_interval=float(os.getenv('MEMBER_FLUSH_INTERVAL', '1.0')),
+            max_batch=int(os.getenv('MEMBER_FLUSH_SIZE', '500')),
+            max_queue=int(os.getenv('MEMBER_QUEUE_SIZE', '10000'))
+        )
 
     async def initialize_db(self):
-        print("Database connection established with Supabase")
-        
+        await self.backend.initialize()
+
+    async def close(self):
+        try:
+            await self.member_lifecycle.close()
+        except Exception as e:
+            print(f"Error flushing member lifecycle queue on close: {e}")
+        if self.write_queue is not None:
+            try:
+                await self.write_queue.close()
+            except Exception as e:
+                print(f"Error flushing stat write queue on close: {e}")
+        # A finished claim would otherwise stay fresh for the stale window and make the
+        # next start skip bootstrap. Claims from a crashed process still wait it out.
+        for server_id in list(self.bootstrap_claims):
+            await self.release_guild_bootstrap(server_id)
+        await self.backend.close()
+
+    def cache_stats(self):
+        return {
+            'profiles': self.profile_cache.stats(),
+            'stats': self.stats_cache.stats(),
+            'pages': self.page_cache.stats(),
+            'totals': self.total_cache.stats()
+        }
+
+    def stats_version(self, server_id, game_name):
+        server_id = snowflake(server_id)
+        return self.stat_versions.get((server_id, None), 0), self.stat_versions.get((server_id, game_name), 0)
+
+    def _bump_stats_version(self, server_id, game_name=None):
+        key = (server_id, game_name)
+        self.stat_versions[key] = self.stat_versions.get(key, 0) + 1
+
+    def coalescing_stats(self):
+        return self.single_flight.stats()
+
+    def write_queue_stats(self):
+        return self.write_queue.stats() if self.write_queue is not None else None
+
+    def member_lifecycle_stats(self):
+        return self.member_lifecycle.stats()
+
+    def _coalesce(self, method, factory, *args):
+        key = (method,) + args
+        return self.single_flight.run(key, factory)
+
+    def _forget_inflight(self, server_id):
+        self.single_flight.forget_where(lambda key: key[1] == server_id)
+
+    def _invalidate_stats(self, server_id, user_id, game_name):
+        self.stats_cache.invalidate((server_id, user_id, game_name), (server_id, user_id, None))
+        self._bump_stats_version(server_id, game_name)
+        self._forget_inflight(server_id)
+
+    def _invalidate_profile(self, server_id, user_id):
+        self.profile_cache.invalidate((server_id, user_id))
+        self._forget_inflight(server_id)
+
+    def _invalidate_server(self, cache, server_id):
+        cache.invalidate_where(lambda key: key[0] == server_id)
+        self._forget_inflight(server_id)
+
+    def _apply_stat_row(self, server_id, user_id, game_name, row):
+        updated_stats = StatRecord.from_row(row)
+
+        self._invalidate_stats(server_id, user_id, game_name)
+        self.stats_cache.set((server_id, user_id, game_name), updated_stats)
+
+        if self.leaderboard_index is not None:
+            self.leaderboard_index.apply(server_id, user_id, game_name, updated_stats)
+
+        return updated_stats
 
     async def insert_or_update_stat(self, server_id, user_id, game_name, **stats):
+        server_id, user_id = snowflake(server_id), snowflake(user_id)
         try:
-            existing_result = self.supabase.table('game_stats').select('*').eq('server_id', server_id).eq('user_id', user_id).eq('game_name', game_name).execute()
-            
-            if existing_result.data:
-                existing_stats = existing_result.data[0]
-                updated_stats = {}
-                
-                stat_names = ['tournaments_played', 'tournaments_won', 'earnings', 'kills', 'deaths', 'wins', 'losses']
-                for stat_name in stat_names:
-                    if stat_name in stats:
-                        updated_stats[stat_name] = existing_stats.get(stat_name, 0) + stats[stat_name]
-                    else:
-                        updated_stats[stat_name] = existing_stats.get(stat_name, 0)
-                
-                new_kills = updated_stats['kills']
-                new_deaths = updated_stats['deaths']
-                new_wins = updated_stats['wins']
-                new_losses = updated_stats['losses']
-
-                updated_stats['kd'] = new_kills / new_deaths if new_deaths > 0 else 0.0
-                updated_stats['wl'] = new_wins / new_losses if new_losses > 0 else 0.0
-
-                result = self.supabase.table('game_stats').update(updated_stats).eq('server_id', server_id).eq('user_id', user_id).eq('game_name', game_name).execute()
-                
-                return [updated_stats[key] for key in ['tournaments_played', 'tournaments_won', 'earnings', 'kills', 'deaths', 'kd', 'wins', 'losses', 'wl']]
-            else:
-                final_stats = {
-                    'server_id': server_id,
-                    'user_id': user_id,
-                    'game_name': game_name,
-                    'tournaments_played': stats.get('tournaments_played', 0),
-                    'tournaments_won': stats.get('tournaments_won', 0),
-                    'earnings': stats.get('earnings', 0),
-                    'kills': stats.get('kills', 0),
-                    'deaths': stats.get('deaths', 0),
-                    'wins': stats.get('wins', 0),
-                    'losses': stats.get('losses', 0)
-                }
-                
-                final_stats['kd'] = final_stats['kills'] / final_stats['deaths'] if final_stats['deaths'] > 0 else 0.0
-                final_stats['wl'] = final_stats['wins'] / final_stats['losses'] if final_stats['losses'] > 0 else 0.0
-
-                result = self.supabase.table('game_stats').insert(final_stats).execute()
-                
-                return [final_stats[key] for key in ['tournaments_played', 'tournaments_won', 'earnings', 'kills', 'deaths', 'kd', 'wins', 'losses', 'wl']]
-                
+            row = await self.backend.increment_stats(server_id, user_id, game_name, stats)
+
+            return self._apply_stat_row(server_id, user_id, game_name, row)
+
         except Exception as e:
             print(f"Error in insert_or_update_stat: {e}")
             raise
 
-    async def get_stats(self, server_id, user_id=None, game_name=None, stat=None):
+    async def increment_stats_batch(self, rows):
         try:
-            query = self.supabase.table('game_stats').select('*').eq('server_id', server_id)
-            
+            payload = []
+            for row in rows:
+                entry = {'server_id': snowflake(row['server_id']), 'user_id': snowflake(row['user_id']), 'game_name': row['game_name']}
+                for stat_name in STAT_COUNTERS:
+                    entry[stat_name] = row.get(stat_name, 0)
+                payload.append(entry)
+            result = await self.backend.increment_stats_batch(payload)
+
+            return [
+                self._apply_stat_row(snowflake(row['server_id']), snowflake(row['user_id']), row['game_name'], row)
+                for row in result
+            ]
+        except Exception as e:
+            print(f"Error in increment_stats_batch: {e}")
+            raise
+
+    def _pending_writes_paused(self):
+        if self.write_queue is None:
+            return contextlib.nullcontext()
+        return self.write_queue.flush_lock
+
+    async def reset_user_stats(self, server_id, user_id, games):
+        server_id, user_id = snowflake(server_id), snowflake(user_id)
+        try:
+            async with self._pending_writes_paused():
+                if self.write_queue is not None:
+                    self.write_queue.discard(server_id, user_id, games)
+                rows = await self.backend.reset_stats(server_id, user_id, list(games))
+
+            return [self._apply_stat_row(server_id, user_id, row['game_name'], row) for row in rows]
+        except Exception as e:
+            print(f"Error in reset_user_stats: {e}")
+            raise
+
+    async def delete_all_user_data(self, server_id, user_id):
+        server_id, user_id = snowflake(server_id), snowflake(user_id)
+        try:
+            async with self._pending_writes_paused():
+                if self.write_queue is not None:
+                    self.write_queue.discard(server_id, user_id)
+                game_names = await self.backend.delete_user_data(server_id, user_id)
+
+            self._invalidate_profile(server_id, user_id)
+            self.player_search.remove(server_id, user_id)
+            for game_name in game_names:
+                self._invalidate_stats(server_id, user_id, game_name)
+                if self.leaderboard_index is not None:
+                    self.leaderboard_index.remove(server_id, user_id, game_name)
+            return game_names
+        except Exception as e:
+            print(f"Error in delete_all_user_data: {e}")
+            raise
+
+    async def init_members(self, members, games):
+        try:
+            profiles = [
+                default_profile(snowflake(server_id), snowflake(user_id), display_name)
+                for server_id, user_id, display_name in members
+            ]
+            rows = await self.backend.init_members(profiles, list(games))
+
+            for profile in profiles:
+                self._invalidate_profile(profile['server_id'], profile['user_id'])
+                self.player_search.remove(profile['server_id'], profile['user_id'])
+            for row in rows:
+                self._apply_stat_row(snowflake(row['server_id']), snowflake(row['user_id']), row['game_name'], row)
+            return len(profiles)
+        except Exception as e:
+            print(f"Error in init_members: {e}")
+            raise
+
+    async def queue_stat_update(self, server_id, user_id, game_name, **stats):
+        server_id, user_id = snowflake(server_id), snowflake(user_id)
+        if self.write_queue is None:
+            return await self.insert_or_update_stat(server_id, user_id, game_name, **stats)
+        await self.write_queue.add(server_id, user_id, game_name, **stats)
+
+    def _overlay_pending(self, server_id, user_id, game_name, stats):
+        if game_name is not None:
+            deltas = self.write_queue.pending_deltas(server_id, user_id, game_name)
+            return (stats or StatRecord()).add(deltas) if deltas else stats
+
+        by_game = dict(stats.items())
+        for pending_game in self.write_queue.pending_games(server_id, user_id):
+            by_game.setdefault(pending_game, None)
+
+        overlaid = StatTable(('game_name',))
+        for game, base in by_game.items():
+            deltas = self.write_queue.pending_deltas(server_id, user_id, game)
+            overlaid.append((game,), (base or StatRecord()).add(deltas) if deltas else base)
+        return overlaid
+
+    async def _fetch_stats(self, server_id, user_id=None, game_name=None, columns=tuple(STAT_NAMES)):
+        key_columns = tuple(column for column, value in (('user_id', user_id), ('game_name', game_name)) if value is None)
+        filters = {column: value for column, value in (('user_id', user_id), ('game_name', game_name)) if value is not None}
+
+        if key_columns:
+            table = StatTable(key_columns, columns)
+            async for rows in self.backend.iter_rows('game_stats', ', '.join(key_columns + columns), server_id, keyset=key_columns, **filters):
+                for row in rows:
+                    table.append([row[column] for column in key_columns], [row.get(stat_name) or 0 for stat_name in columns])
+            return table
+
+        data = await self.backend.select('game_stats', ', '.join(columns), server_id, **filters)
+
+        if not data:
+            return None
+
+        if columns == tuple(STAT_NAMES):
+            return StatRecord.from_row(data[0])
+        return tuple(data[0].get(stat_name) or 0 for stat_name in columns)
+
+    def _project_stats(self, stats, game_name, columns):
+        if game_name is None:
+            return stats.project(columns)
+        return tuple(getattr(stats, stat_name) for stat_name in columns) if stats else stats
+
+    async def get_stats(self, server_id, user_id=None, game_name=None, stat=None, columns=None):
+        server_id, user_id = snowflake(server_id), snowflake(user_id)
+        if columns is None and stat is not None:
+            columns = (stat,)
+        if columns is not None:
+            columns = tuple(columns)
+            unknown = [stat_name for stat_name in columns if stat_name not in STAT_NAMES]
+            if unknown:
+                raise ValueError(f"Unknown stat: {', '.join(unknown)}")
             if user_id is not None:
-                query = query.eq('user_id', user_id)
-            
-            if game_name is not None:
-                query = query.eq('game_name', game_name)
-            
-            result = query.execute()
-            
-            if not result.data:
-                return None if user_id and game_name else []
+                return self._project_stats(await self.get_stats(server_id, user_id, game_name), game_name, columns)
+
+        try:
+            if columns is not None:
+                return await self._coalesce(
+                    'get_stats',
+                    lambda: self._fetch_stats(server_id, user_id, game_name, columns),
+                    server_id,
+                    user_id,
+                    game_name,
+                    columns
+                )
+
+            def fetch():
+                return self._fetch_stats(server_id, user_id, game_name)
 
             if user_id is None:
-                processed_results = []
-                for row in result.data:
-                    if game_name is None:
-                        processed_row = [row['user_id'], row['game_name']]
-                    else:
-                        processed_row = [row['user_id']]
-
-                    stat_names = ['tournaments_played', 'tournaments_won', 'earnings', 'kills', 'deaths', 'kd', 'wins', 'losses', 'wl']
-                    for stat_name in stat_names:
-                        processed_row.append(row.get(stat_name, 0))
-                    
-                    processed_results.append(processed_row)
-                return processed_results
-            else:
-                if game_name is None:
-                    processed_results = []
-                    for row in result.data:
-                        processed_row = [row['game_name']]
-                        stat_names = ['tournaments_played', 'tournaments_won', 'earnings', 'kills', 'deaths', 'kd', 'wins', 'losses', 'wl']
-                        for stat_name in stat_names:
-                            processed_row.append(row.get(stat_name, 0))
-                        processed_results.append(processed_row)
-                    return processed_results
-                else:
-                    row = result.data[0]
-                    stat_names = ['tournaments_played', 'tournaments_won', 'earnings', 'kills', 'deaths', 'kd', 'wins', 'losses', 'wl']
-                    return [row.get(stat_name, 0) for stat_name in stat_names]
-                    
+                return await self._coalesce('get_stats', fetch, server_id, user_id, game_name)
+
+            cache_key = (server_id, user_id, game_name)
+            cached = self.stats_cache.get(cache_key)
+            if cached is MISSING:
+                generation = self.stats_cache.generation
+                cached = await self._coalesce('get_stats', fetch, server_id, user_id, game_name)
+                self.stats_cache.set(cache_key, cached, generation)
+
+            if self.write_queue is not None:
+                return self._overlay_pending(server_id, user_id, game_name, cached)
+            return cached
         except Exception as e:
             print(f"Error in get_stats: {e}")
             return None if user_id and game_name else []
 
+    async def get_ranked_stats(self, server_id, game_name, stat, offset=0, limit=10):
+        server_id = snowflake(server_id)
+        if stat not in STAT_NAMES:
+            raise ValueError(f"Unknown stat: {stat}")
+
+        return await self._coalesce(
+            'get_ranked_stats',
+            lambda: self._fetch_ranked_stats(server_id, game_name, stat, offset, limit),
+            server_id,
+            game_name,
+            stat,
+            offset,
+            limit
+        )
+
+    async def _fetch_ranked_stats(self, server_id, game_name, stat, offset, limit):
+        try:
+            # The row count only changes with a stats write, so count once per stats version
+            # instead of on every page flip.
+            total_key = (server_id, game_name, self.stats_version(server_id, game_name))
+            total = self.total_cache.get(total_key)
+            page, counted = await self.backend.ranked_page(server_id, game_name, stat, offset, limit, count=total is MISSING)
+            if total is MISSING:
+                total = counted
+                self.total_cache.set(total_key, total)
+            return [(snowflake(user_id), value) for user_id, value in page], total
+        except Exception as e:
+            print(f"Error in get_ranked_stats: {e}")
+            return [], 0
+
+    async def count_game_stats(self, server_id, game_name):
+        server_id = snowflake(server_id)
+        total_key = (server_id, game_name, self.stats_version(server_id, game_name))
+        total = self.total_cache.get(total_key)
+        if total is MISSING:
+            total = await self.backend.count_rows('game_stats', server_id, game_name=game_name)
+            self.total_cache.set(total_key, total)
+        return total
+
+    async def get_leaderboard_page(self, server_id, game_name, stat, offset=0, limit=10):
+        server_id = snowflake(server_id)
+        if self.leaderboard_index is not None:
+            try:
+                if await self.leaderboard_index.ensure(server_id, game_name):
+                    return self.leaderboard_index.page(server_id, game_name, stat, offset=offset, limit=limit)
+            except Exception as e:
+                print(f"Error in get_leaderboard_page: {e}")
+                return [], 0
+
+        return await self.get_ranked_stats(server_id, game_name, stat, offset=offset, limit=limit)
+
+    async def get_user_rank(self, server_id, game_name, stat, user_id):
+        server_id, user_id = snowflake(server_id), snowflake(user_id)
+        if self.leaderboard_index is not None:
+            try:
+                if await self.leaderboard_index.ensure(server_id, game_name):
+                    return self.leaderboard_index.rank(server_id, game_name, stat, user_id)
+            except Exception as e:
+                print(f"Error in get_user_rank: {e}")
+                return None
+
+        try:
+            stats = await self.get_stats(server_id, user_id, game_name)
+            if not stats:
+                return None
+            value = getattr(stats, stat)
+
+            rank, total = await self.backend.user_rank(server_id, game_name, stat, user_id, value)
+            return rank, total, value
+        except Exception as e:
+            print(f"Error in get_user_rank: {e}")
+            return None
+
     async def delete_stats(self, server_id, user_id, game_name):
+        server_id, user_id = snowflake(server_id), snowflake(user_id)
         try:
-            result = self.supabase.table('game_stats').delete().eq('server_id', server_id).eq('user_id', user_id).eq('game_name', game_name).execute()
+            await self.backend.delete('game_stats', server_id, user_id=user_id, game_name=game_name)
+            self._invalidate_stats(server_id, user_id, game_name)
+
+            if self.leaderboard_index is not None:
+                self.leaderboard_index.remove(server_id, user_id, game_name)
         except Exception as e:
             print(f"Error in delete_stats: {e}")
             raise
 
-    async def create_user_profile(self, server_id, user_id):
+    async def iter_stats(self, server_id, game_name, page_size=SELECT_PAGE_SIZE):
+        server_id = snowflake(server_id)
+        columns = 'user_id, ' + ', '.join(STAT_NAMES)
+        async for rows in self.backend.iter_rows('game_stats', columns, server_id, page_size, game_name=game_name):
+            for row in rows:
+                yield snowflake(row['user_id']), StatRecord.from_row(row)
+
+    async def _fetch_game_stat_rows(self, server_id, game_name):
+        table = StatTable()
+        async for user_id, stats in self.iter_stats(server_id, game_name):
+            table.append((user_id,), stats)
+        return table
+
+    async def get_game_stat_rows(self, server_id, game_name):
+        server_id = snowflake(server_id)
         try:
-            existing_result = self.supabase.table('user_profiles').select('*').eq('server_id', server_id).eq('user_id', user_id).execute()
-            
-            if not existing_result.data:
-                profile_data = {
-                    'server_id': server_id,
-                    'user_id': user_id,
-                    'gaming_bio': '',
-                    'main_game': 'r6s',
-                    'social_links': '{}',
-                    'embed_color': '0x00d4ff',
-                    'timezone': 'UTC',
-                    'team_affiliation': '',
-                    'bf6_favorite_class': '',
-                    'r6s_role': '',
-                    'r6s_favorite_operator': ''
-                }
-                result = self.supabase.table('user_profiles').insert(profile_data).execute()
+            return await self._coalesce(
+                'get_game_stat_rows',
+                lambda: self._fetch_game_stat_rows(server_id, game_name),
+                server_id,
+                game_name
+            )
+        except Exception as e:
+            print(f"Error in get_game_stat_rows: {e}")
+            raise
+
+    async def get_stat_keys(self, server_id, game_names):
+        server_id = snowflake(server_id)
+        try:
+            keys = set()
+            for game_name in game_names:
+                async for rows in self.backend.iter_rows('game_stats', 'user_id', server_id, game_name=game_name):
+                    keys.update((snowflake(row['user_id']), game_name) for row in rows)
+            return keys
+        except Exception as e:
+            print(f"Error in get_stat_keys: {e}")
+            raise
+
+    async def bulk_create_stats(self, server_id, keys, chunk_size=BULK_CHUNK_SIZE):
+        server_id = snowflake(server_id)
+        try:
+            rows = [default_stats(server_id, snowflake(user_id), game_name) for user_id, game_name in sorted(keys)]
+            created = await self.backend.insert_missing('game_stats', rows, ('server_id', 'user_id', 'game_name'), chunk_size)
+
+            if created:
+                self._invalidate_server(self.stats_cache, server_id)
+                self._bump_stats_version(server_id)
+                if self.leaderboard_index is not None:
+                    self.leaderboard_index.invalidate(server_id)
+
+            return created
+        except Exception as e:
+            print(f"Error in bulk_create_stats: {e}")
+            raise
+
+    async def claim_guild_bootstrap(self, server_id, shard_id, cluster_id, stale_after):
+        server_id = snowflake(server_id)
+        try:
+            claimed = await self.backend.claim_bootstrap(server_id, shard_id, cluster_id, stale_after)
+            if claimed:
+                self.bootstrap_claims[server_id] = cluster_id
+            return claimed
+        except Exception as e:
+            print(f"Error in claim_guild_bootstrap: {e}")
+            raise
+
+    async def finish_guild_bootstrap(self, server_id, members):
+        server_id = snowflake(server_id)
+        try:
+            await self.backend.update('guild_bootstrap', {'members': members}, server_id)
+        except Exception as e:
+            print(f"Error in finish_guild_bootstrap: {e}")
+
+    async def release_guild_bootstrap(self, server_id):
+        server_id = snowflake(server_id)
+        cluster_id = self.bootstrap_claims.pop(server_id, None)
+        try:
+            # Only delete our own claim, in case it went stale and another cluster took it over.
+            filters = {'cluster_id': cluster_id} if cluster_id is not None else {}
+            await self.backend.delete('guild_bootstrap', server_id, **filters)
+        except Exception as e:
+            print(f"Error in release_guild_bootstrap: {e}")
+
+    async def create_user_profile(self, server_id, user_id, display_name=''):
+        server_id, user_id = snowflake(server_id), snowflake(user_id)
+        try:
+            generation = self.profile_cache.generation
+            row = await self.backend.ensure_profile(default_profile(server_id, user_id, display_name))
+            profile = profile_from_row(row)
+            if self.profile_cache.generation == generation:
+                self.profile_cache.set((server_id, user_id), profile)
+            else:
+                self._invalidate_profile(server_id, user_id)
+            return profile
         except Exception as e:
             print(f"Error in create_user_profile: {e}")
             raise
 
+    async def get_profile_display_names(self, server_id):
+        server_id = snowflake(server_id)
+        try:
+            return {
+                snowflake(row['user_id']): row.get('display_name') or ''
+                async for rows in self.backend.iter_rows('user_profiles', 'user_id, display_name', server_id)
+                for row in rows
+            }
+        except Exception as e:
+            print(f"Error in get_profile_display_names: {e}")
+            raise
+
+    async def bulk_set_display_names(self, server_id, display_names, chunk_size=BULK_CHUNK_SIZE):
+        server_id = snowflake(server_id)
+        try:
+            names = [
+                {'user_id': snowflake(user_id), 'display_name': display_name}
+                for user_id, display_name in sorted(display_names.items())
+            ]
+            for start in range(0, len(names), chunk_size):
+                await self.backend.set_display_names(server_id, names[start:start + chunk_size])
+
+            if names:
+                self._invalidate_server(self.profile_cache, server_id)
+
+            return len(names)
+        except Exception as e:
+            print(f"Error in bulk_set_display_names: {e}")
+            raise
+
+    async def bulk_create_user_profiles(self, server_id, user_ids, chunk_size=BULK_CHUNK_SIZE, display_names=None):
+        server_id = snowflake(server_id)
+        display_names = display_names or {}
+        try:
+            rows = [
+                default_profile(server_id, snowflake(user_id), display_names.get(user_id, ''))
+                for user_id in sorted(user_ids)
+            ]
+            created = await self.backend.insert_missing('user_profiles', rows, ('server_id', 'user_id'), chunk_size)
+
+            if created:
+                self._invalidate_server(self.profile_cache, server_id)
+
+            return created
+        except Exception as e:
+            print(f"Error in bulk_create_user_profiles: {e}")
+            raise
+
+    async def _fetch_user_profile(self, server_id, user_id):
+        data = await self.backend.select('user_profiles', ', '.join(PROFILE_COLUMNS), server_id, user_id=user_id)
+
+        if data:
+            return profile_from_row(data[0])
+        return None
+
     async def get_user_profile(self, server_id, user_id):
+        server_id, user_id = snowflake(server_id), snowflake(user_id)
         try:
-            result = self.supabase.table('user_profiles').select('gaming_bio, main_game, social_links, embed_color, timezone, team_affiliation, bf6_favorite_class, r6s_role, r6s_favorite_operator').eq('server_id', server_id).eq('user_id', user_id).execute()
-            
-            if result.data:
-                row = result.data[0]
-                return (
-                    row.get('gaming_bio', ''),
-                    row.get('main_game', 'r6s'),
-                    row.get('social_links', '{}'),
-                    row.get('embed_color', '0x00d4ff'),
-                    row.get('timezone', 'UTC'),
-                    row.get('team_affiliation', ''),
-                    row.get('bf6_favorite_class', ''),
-                    row.get('r6s_role', ''),
-                    row.get('r6s_favorite_operator', '')
-                )
-            return None
+            cache_key = (server_id, user_id)
+            cached = self.profile_cache.get(cache_key)
+            if cached is not MISSING:
+                return cached
+
+            generation = self.profile_cache.generation
+            profile = await self._coalesce(
+                'get_user_profile',
+                lambda: self._fetch_user_profile(server_id, user_id),
+                server_id,
+                user_id
+            )
+            self.profile_cache.set(cache_key, profile, generation)
+            return profile
         except Exception as e:
             print(f"Error in get_user_profile: {e}")
             return None
 
+    async def _fetch_profile_card(self, server_id, user_id):
+        profile_generation, stats_generation = self.profile_cache.generation, self.stats_cache.generation
+        profile_row, stats_row = await self.backend.profile_card(server_id, user_id, default_profile(server_id, user_id))
+
+        profile = profile_from_row(profile_row)
+        main_game = profile[1]
+        stats = StatRecord.from_row(stats_row) if stats_row else None
+        self.profile_cache.set((server_id, user_id), profile, profile_generation)
+        if main_game:
+            self.stats_cache.set((server_id, user_id, main_game), stats, stats_generation)
+        return profile, stats
+
+    async def get_profile_card(self, server_id, user_id):
+        server_id, user_id = snowflake(server_id), snowflake(user_id)
+        try:
+            profile = self.profile_cache.get((server_id, user_id))
+            if profile is MISSING or profile is None:
+                profile, stats = await self._coalesce(
+                    'get_profile_card',
+                    lambda: self._fetch_profile_card(server_id, user_id),
+                    server_id,
+                    user_id
+                )
+                if self.write_queue is not None and profile[1]:
+                    stats = self._overlay_pending(server_id, user_id, profile[1], stats)
+                return profile, stats
+
+            main_game = profile[1]
+            return profile, await self.get_stats(server_id, user_id, main_game) if main_game else None
+        except Exception as e:
+            print(f"Error in get_profile_card: {e}")
+            raise
+
     async def update_user_profile(self, server_id, user_id, **profile_data):
+        server_id, user_id = snowflake(server_id), snowflake(user_id)
         try:
-            valid_fields = ['gaming_bio', 'main_game', 'social_links', 'embed_color', 'timezone', 'team_affiliation', 'bf6_favorite_class', 'r6s_role', 'r6s_favorite_operator']
-            update_fields = {k: v for k, v in profile_data.items() if k in valid_fields}
+            update_fields = {k: v for k, v in profile_data.items() if k in PROFILE_COLUMNS}
             
             if update_fields:
-                result = self.supabase.table('user_profiles').update(update_fields).eq('server_id', server_id).eq('user_id', user_id).execute()
+                await self.backend.update('user_profiles', update_fields, server_id, user_id=user_id)
+                self._invalidate_profile(server_id, user_id)
         except Exception as e:
             print(f"Error in update_user_profile: {e}")
             raise
 
+    async def set_display_name(self, server_id, user_id, display_name):
+        server_id, user_id = snowflake(server_id), snowflake(user_id)
+        try:
+            await self.backend.update('user_profiles', {'display_name': display_name}, server_id, user_id=user_id)
+        except Exception as e:
+            print(f"Error in set_display_name: {e}")
+
+    async def get_display_names(self, server_id, user_ids):
+        server_id = snowflake(server_id)
+        try:
+            rows = await self.backend.select_in(
+                'user_profiles',
+                'user_id, display_name',
+                server_id,
+                'user_id',
+                [snowflake(user_id) for user_id in user_ids]
+            )
+            return {snowflake(row['user_id']): row['display_name'] for row in rows if row.get('display_name')}
+        except Exception as e:
+            print(f"Error in get_display_names: {e}")
+            return {}
+
     async def delete_user_profile(self, server_id, user_id):
+        server_id, user_id = snowflake(server_id), snowflake(user_id)
         try:
-            result = self.supabase.table('user_profiles').delete().eq('server_id', server_id).eq('user_id', user_id).execute()
+            await self.backend.delete('user_profiles', server_id, user_id=user_id)
+            self._invalidate_profile(server_id, user_id)
         except Exception as e:
             print(f"Error in delete_user_profile: {e}")
             raise
 
     async def player_left(self, server_id, user_id, user_name, display_name):
+        server_id, user_id = snowflake(server_id), snowflake(user_id)
         try:
-            existing_result = self.supabase.table('player_left').select('*').eq('server_id', server_id).eq('user_id', user_id).execute()
-            
-            if not existing_result.data:
-                player_data = {
-                    'server_id': server_id,
-                    'user_id': user_id,
-                    'user_name': user_name,
-                    'display_name': display_name
-                }
-                result = self.supabase.table('player_left').insert(player_data).execute()
+            row = await self.backend.ensure_player_left({
+                'server_id': server_id,
+                'user_id': user_id,
+                'user_name': user_name,
+                'display_name': display_name
+            })
+            self.player_search.add(server_id, user_id, row['user_name'], row['display_name'])
+            return snowflake(row['user_id']), row['user_name'], row['display_name']
         except Exception as e:
             print(f"Error in player_left: {e}")
             raise
 
+    async def players_left(self, players, chunk_size=BULK_CHUNK_SIZE):
+        try:
+            rows = [
+                {'server_id': snowflake(server_id), 'user_id': snowflake(user_id), 'user_name': user_name, 'display_name': display_name}
+                for server_id, user_id, user_name, display_name in players
+            ]
+            created = await self.backend.insert_missing('player_left', rows, ('server_id', 'user_id'), chunk_size)
+
+            for row in rows:
+                self.player_search.add(row['server_id'], row['user_id'], row['user_name'], row['display_name'])
+            return created
+        except Exception as e:
+            print(f"Error in players_left: {e}")
+            raise
+
     async def get_player_left(self, server_id, user_id):
+        server_id, user_id = snowflake(server_id), snowflake(user_id)
         try:
-            result = self.supabase.table('player_left').select('user_name, display_name').eq('server_id', server_id).eq('user_id', user_id).execute()
+            data = await self.backend.select('player_left', 'user_name, display_name', server_id, user_id=user_id)
             
-            if result.data:
-                row = result.data[0]
+            if data:
+                row = data[0]
                 return (row.get('user_name', ''), row.get('display_name', ''))
             return None
         except Exception as e:
@@ -215,24 +721,38 @@ class GameStatsDatabase:
             return None
 
     async def delete_player_left(self, server_id, user_id):
+        server_id, user_id = snowflake(server_id), snowflake(user_id)
         try:
-            result = self.supabase.table('player_left').delete().eq('server_id', server_id).eq('user_id', user_id).execute()
+            await self.backend.delete('player_left', server_id, user_id=user_id)
+            self.player_search.remove(server_id, user_id)
         except Exception as e:
             print(f"Error in delete_player_left: {e}")
             raise
 
+    async def iter_players_left(self, server_id, page_size=SELECT_PAGE_SIZE):
+        server_id = snowflake(server_id)
+        async for rows in self.backend.iter_rows('player_left', 'user_id, user_name, display_name', server_id, page_size):
+            for row in rows:
+                yield snowflake(row['user_id']), row.get('user_name', ''), row.get('display_name', '')
+
     async def get_server_players_left(self, server_id):
+        server_id = snowflake(server_id)
         try:
-            result = self.supabase.table('player_left').select('user_id, user_name, display_name').eq('server_id', server_id).execute()
-            
-            processed_results = []
-            for row in result.data:
-                processed_results.append((
-                    row.get('user_id', ''),
-                    row.get('user_name', ''),
-                    row.get('display_name', '')
-                ))
-            return processed_results
+            return [player async for player in self.iter_players_left(server_id)]
         except Exception as e:
             print(f"Error in get_server_players_left: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    async def search_players_left(self, server_id, query, limit=25):
+        server_id = snowflake(server_id)
+        try:
+            if not self.player_search.is_loaded(server_id):
+                lock = self.player_search_locks.setdefault(server_id, asyncio.Lock())
+                async with lock:
+                    if not self.player_search.is_loaded(server_id):
+                        await self.player_search.load(server_id, self.iter_players_left(server_id))
+
+            return self.player_search.search(server_id, query, limit=limit)
+        except Exception as e:
+            print(f"Error in search_players_left: {e}")
+            return []
@@ -0,0 +1,94 @@
+from collections import OrderedDict
+import asyncio
+import time
+
+MISSING = object()
+
+class TTLCache:
+    def __init__(self, maxsize=4096, ttl=60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return MISSING
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key, value, generation=None):
+        if generation is not None and generation != self.generation:
+            return
+
+        self.entries[key] = (time.monotonic() + self.ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, *keys):
+        self.generation += 1
+        for key in keys:
+            self.entries.pop(key, None)
+
+    def invalidate_where(self, predicate):
+        self.generation += 1
+        for key in [key for key in self.entries if predicate(key)]:
+            del self.entries[key]
+
+    def clear(self):
+        self.generation += 1
+        self.entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': len(self.entries)
+        }
+
+class SingleFlight:
+    def __init__(self):
+        self.inflight = {}
+        self.calls = 0
+        self.deduplicated = 0
+
+    async def run(self, key, factory):
+        self.calls += 1
+        future = self.inflight.get(key)
+        if future is not None:
+            self.deduplicated += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.ensure_future(factory())
+        self.inflight[key] = future
+        future.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(future)
+
+    def _finish(self, key, future):
+        if self.inflight.get(key) is future:
+            del self.inflight[key]
+        if not future.cancelled():
+            future.exception()
+
+    def forget_where(self, predicate):
+        for key in [key for key in self.inflight if predicate(key)]:
+            del self.inflight[key]
+
+    def stats(self):
+        return {
+            'calls': self.calls,
+            'deduplicated': self.deduplicated,
+            'dedup_rate': self.deduplicated / self.calls if self.calls else 0.0,
+            'inflight': len(self.inflight)
+        }
@@ -79,16 +79,21 @@ class ProfileEditView(ui.LayoutView):
         self.user_id = user_id
 
     async def refresh_content(self, interaction: Interaction):
-        profile = await self.db.get_user_profile(str(interaction.guild_id), str(self.user_id))
+        profile = await self.db.get_user_profile(interaction.guild_id, self.user_id)
         if not profile:
-            await self.db.create_user_profile(str(interaction.guild_id), str(self.user_id))
-            profile = await self.db.get_user_profile(str(interaction.guild_id), str(self.user_id))
+            profile = await self.db.create_user_profile(interaction.guild_id, self.user_id)
 
         gaming_bio, main_game, social_links_str, embed_color, timezone, team_affiliation, bf6_class, r6s_role, r6s_favorite_operator = profile
         social_links = json.loads(social_links_str) if social_links_str else {}
 
         user = interaction.guild.get_member(self.user_id)
-        user_name = user.display_name if user else "Unknown User"
+        if user is None and interaction.user.id == self.user_id:
+            user = interaction.user
+        if user:
+            user_name = user.display_name
+        else:
+            stored_names = await self.db.get_display_names(interaction.guild_id, [self.user_id])
+            user_name = stored_names.get(self.user_id, "Unknown User")
         self.clear_items()
 
         container = ui.Container(accent_color=0x00d4ff)
@@ -173,7 +178,7 @@ class EditBioButton(ui.Button['ProfileEditView']):
         self.parent_view = parent_view
 
     async def callback(self, interaction: Interaction):
-        profile = await self.db.get_user_profile(str(interaction.guild_id), str(self.user_id))
+        profile = await self.db.get_user_profile(interaction.guild_id, self.user_id)
         existing_bio = profile[0] if profile else ""
 
         modal = BioModal(self.db, self.user_id, self.parent_view, existing_bio)
@@ -199,7 +204,7 @@ class EditSocialButton(ui.Button['ProfileEditView']):
         self.parent_view = parent_view
 
     async def callback(self, interaction: Interaction):
-        profile = await self.db.get_user_profile(str(interaction.guild_id), str(self.user_id))
+        profile = await self.db.get_user_profile(interaction.guild_id, self.user_id)
         existing_links = {}
         if profile and profile[2]:
             existing_links = json.loads(profile[2])
@@ -260,7 +265,7 @@ class EditR6SPreferencesButton(ui.Button['ProfileEditView']):
         self.parent_view = parent_view
 
     async def callback(self, interaction: Interaction):
-        profile = await self.db.get_user_profile(str(interaction.guild_id), str(self.user_id))
+        profile = await self.db.get_user_profile(interaction.guild_id, self.user_id)
         existing_r6s_role = profile[7] if profile else ''
         existing_r6s_operator = profile[8] if profile else ''
 
@@ -288,13 +293,14 @@ class BioModal(ui.Modal):
         self.bio.default = existing_bio or ''
 
     async def on_submit(self, interaction: Interaction):
+        await interaction.response.defer()
         await self.db.update_user_profile(
-            str(interaction.guild_id),
-            str(self.user_id),
+            interaction.guild_id,
+            self.user_id,
             gaming_bio=self.bio.value
         )
         await self.parent_view.refresh_content(interaction)
-        await interaction.response.edit_message(view=self.parent_view)
+        await interaction.edit_original_response(view=self.parent_view)
 
 class SocialLinksModal(ui.Modal):
     def __init__(self, db, user_id, parent_view, existing_links=None):
@@ -349,7 +355,8 @@ class SocialLinksModal(ui.Modal):
         self.tiktok.default = existing_links.get('tiktok', '')
 
     async def on_submit(self, interaction: Interaction):
-        profile = await self.db.get_user_profile(str(interaction.guild_id), str(self.user_id))
+        await interaction.response.defer()
+        profile = await self.db.get_user_profile(interaction.guild_id, self.user_id)
         existing_links = {}
         if profile and profile[2]:
             existing_links = json.loads(profile[2])
@@ -380,12 +387,12 @@ class SocialLinksModal(ui.Modal):
             del existing_links['tiktok']
 
         await self.db.update_user_profile(
-            str(interaction.guild_id),
-            str(self.user_id),
+            interaction.guild_id,
+            self.user_id,
             social_links=json.dumps(existing_links)
         )
         await self.parent_view.refresh_content(interaction)
-        await interaction.response.edit_message(view=self.parent_view)
+        await interaction.edit_original_response(view=self.parent_view)
 
 class TeamModal(ui.Modal):
     def __init__(self, db, user_id, parent_view):
@@ -402,13 +409,14 @@ class TeamModal(ui.Modal):
     )
 
     async def on_submit(self, interaction: Interaction):
+        await interaction.response.defer()
         await self.db.update_user_profile(
-            str(interaction.guild_id),
-            str(self.user_id),
+            interaction.guild_id,
+            self.user_id,
             team_affiliation=self.team.value
         )
         await self.parent_view.refresh_content(interaction)
-        await interaction.response.edit_message(view=self.parent_view)
+        await interaction.edit_original_response(view=self.parent_view)
 
 class BF6PreferencesView(ui.LayoutView):
     def __init__(self, db, user_id, parent_view):
@@ -460,6 +468,7 @@ class R6SPreferencesModal(ui.Modal):
         self.favorite_operator.default = self.existing_operator
 
     async def on_submit(self, interaction: Interaction):
+        await interaction.response.defer()
         role_value = self.role.value.lower().strip() if self.role.value else ''
         valid_roles = ['entry', 'support', 'flex']
 
@@ -467,13 +476,13 @@ class R6SPreferencesModal(ui.Modal):
             role_value = self.existing_role
 
         await self.db.update_user_profile(
-            str(interaction.guild_id),
-            str(self.user_id),
+            interaction.guild_id,
+            self.user_id,
             r6s_role=role_value,
             r6s_favorite_operator=self.favorite_operator.value
         )
         await self.parent_view.refresh_content(interaction)
-        await interaction.response.edit_message(view=self.parent_view)
+        await interaction.edit_original_response(view=self.parent_view)
 
 class GameSelectView(ui.LayoutView):
     def __init__(self, db, user_id, parent_view):
@@ -511,13 +520,14 @@ class GameSelectDropdown(ui.ActionRow['GameSelectView']):
         max_values=1
     )
     async def select_game(self, interaction: Interaction, select: ui.Select):
+        await interaction.response.defer()
         await self.db.update_user_profile(
-            str(interaction.guild_id),
-            str(self.user_id),
+            interaction.guild_id,
+            self.user_id,
             main_game=select.values[0]
         )
         await self.parent_view.refresh_content(interaction)
-        await interaction.response.edit_message(view=self.parent_view)
+        await interaction.edit_original_response(view=self.parent_view)
 
 class TimezoneSelectView(ui.LayoutView):
     def __init__(self, db, user_id, parent_view):
@@ -555,13 +565,14 @@ class TimezoneSelectDropdown(ui.ActionRow['TimezoneSelectView']):
         max_values=1
     )
     async def select_timezone(self, interaction: Interaction, select: ui.Select):
+        await interaction.response.defer()
         await self.db.update_user_profile(
-            str(interaction.guild_id),
-            str(self.user_id),
+            interaction.guild_id,
+            self.user_id,
             timezone=select.values[0]
         )
         await self.parent_view.refresh_content(interaction)
-        await interaction.response.edit_message(view=self.parent_view)
+        await interaction.edit_original_response(view=self.parent_view)
 
 class ColorSelectView(ui.LayoutView):
     def __init__(self, db, user_id, parent_view):
@@ -599,13 +610,14 @@ class ColorSelectDropdown(ui.ActionRow['ColorSelectView']):
         max_values=1
     )
     async def select_color(self, interaction: Interaction, select: ui.Select):
+        await interaction.response.defer()
         await self.db.update_user_profile(
-            str(interaction.guild_id),
-            str(self.user_id),
+            interaction.guild_id,
+            self.user_id,
             embed_color=select.values[0]
         )
         await self.parent_view.refresh_content(interaction)
-        await interaction.response.edit_message(view=self.parent_view)
+        await interaction.edit_original_response(view=self.parent_view)
 
 class BF6ClassSelectDropdown(ui.ActionRow['BF6PreferencesView']):
     def __init__(self, db, user_id, parent_view):
@@ -621,13 +633,14 @@ class BF6ClassSelectDropdown(ui.ActionRow['BF6PreferencesView']):
         max_values=1
     )
     async def select_class(self, interaction: Interaction, select: ui.Select):
+        await interaction.response.defer()
         await self.db.update_user_profile(
-            str(interaction.guild_id),
-            str(self.user_id),
+            interaction.guild_id,
+            self.user_id,
             bf6_favorite_class=select.values[0]
         )
         await self.parent_view.refresh_content(interaction)
-        await interaction.response.edit_message(view=self.parent_view)
+        await interaction.edit_original_response(view=self.parent_view)
 
 class BackToProfileButton(ui.Button):
     def __init__(self, parent_view):
@@ -635,5 +648,6 @@ class BackToProfileButton(ui.Button):
         self.parent_view = parent_view
 
     async def callback(self, interaction: Interaction):
+        await interaction.response.defer()
         await self.parent_view.refresh_content(interaction)
-        await interaction.response.edit_message(view=self.parent_view)
\ No newline at end of file
+        await interaction.edit_original_response(view=self.parent_view)
\ No newline at end of file
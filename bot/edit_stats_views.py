@@ -99,7 +99,7 @@ class GameSelectDropdown(ui.ActionRow['SelectGameView']):
 		game = select.values[0]
 		stats = await self.db.get_stats(i.guild_id, self.user.id, game, stat=None)
 		if stats is None:
-			stats = await self.db.insert_or_update_stat(i.guild_id, self.user.id, game, tournaments_played=0, earnings=0, kills=0, deaths=0, kd=0.0, wins=0, losses=0, wl=0.0)
+			stats = await self.db.insert_or_update_stat(i.guild_id, self.user.id, game)
 
 		await i.response.edit_message(view=SetStatsView(self.db, self.user, game, stats, just_updated=False))
 
@@ -124,23 +124,20 @@ class SetStatsView(ui.LayoutView):
 		container.add_item(header)
 		container.add_item(ui.Separator(spacing=discord.SeparatorSpacing.large))
 
-		kd_ratio = stats[3] / stats[4] if stats[4] > 0 else 0.0
-		wl_ratio = stats[6] / stats[7] if stats[7] > 0 else 0.0
-
 		status_text = "✅ Stats Updated Successfully!" if self.just_updated else "Ready to Edit"
 		status_emoji = "✅" if self.just_updated else "🎮"
 
 		stats_text = (
 			f'## 📈 Current Statistics\n'
-			f'🏆 **Tournaments Played:** `{stats[0]}`\n'
-			f'🥇 **Tournaments Won:** `{stats[1]}`\n'
-			f'💰 **Earnings:** `${stats[2]:,}`\n'
-			f'🎯 **K/D Ratio:** `{kd_ratio:.2f}`\n'
-			f'⚔️ **Kills:** `{stats[3]}`\n'
-			f'💀 **Deaths:** `{stats[4]}`\n'
-			f'🏅 **W/L Ratio:** `{wl_ratio:.2f}`\n'
-			f'✅ **Wins:** `{stats[6]}`\n'
-			f'❌ **Losses:** `{stats[7]}`\n'
+			f'🏆 **Tournaments Played:** `{stats.tournaments_played}`\n'
+			f'🥇 **Tournaments Won:** `{stats.tournaments_won}`\n'
+			f'💰 **Earnings:** `${stats.earnings:,}`\n'
+			f'🎯 **K/D Ratio:** `{stats.kd:.2f}`\n'
+			f'⚔️ **Kills:** `{stats.kills}`\n'
+			f'💀 **Deaths:** `{stats.deaths}`\n'
+			f'🏅 **W/L Ratio:** `{stats.wl:.2f}`\n'
+			f'✅ **Wins:** `{stats.wins}`\n'
+			f'❌ **Losses:** `{stats.losses}`\n'
 			f'{status_emoji} **Status:** `{status_text}`'
 		)
 
@@ -260,7 +257,7 @@ class SetStatsModal(ui.Modal):
 				await interaction.response.send_message(view=ui.LayoutView().add_item(container), ephemeral=True)
 				return
 
-			await self.db.insert_or_update_stat(
+			await self.db.queue_stat_update(
 				interaction.guild_id,
 				self.user.id,
 				self.game,
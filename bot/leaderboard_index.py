@@ -0,0 +1,178 @@
+from sortedcontainers import SortedList
+from collections import OrderedDict
+import asyncio
+from bot.stats import STAT_NAMES, StatRecord, rank_key
+
+MAX_BUILD_ATTEMPTS = 3
+
+class LeaderboardIndex:
+    def __init__(self, db, max_keys=4, min_rows=10000):
+        # Each loaded guild/game holds every row in memory (roughly 1.5 KB per row), so only
+        # guilds with at least min_rows rows are indexed and at most max_keys stay loaded,
+        # least recently used first out. Everything else is served by ranked queries.
+        self.db = db
+        self.max_keys = max_keys
+        self.min_rows = min_rows
+        self.rows = OrderedDict()
+        self.rankings = {}
+        self.generations = {}
+        self.building = {}
+        self.build_locks = {}
+        self.builds = 0
+        self.evictions = 0
+
+    def _key(self, server_id, game_name):
+        return (server_id, game_name)
+
+    def is_loaded(self, server_id, game_name):
+        return self._key(server_id, game_name) in self.rows
+
+    def loaded_keys(self):
+        return list(self.rows)
+
+    def _bump(self, key):
+        self.generations[key] = self.generations.get(key, 0) + 1
+
+    def _load(self, key, all_stats):
+        rows = dict(all_stats.items())
+        self.rows[key] = rows
+        for stat in STAT_NAMES:
+            self.rankings[key + (stat,)] = SortedList(
+                rank_key(stat, value, user_id) for user_id, value in zip(all_stats.keys(), all_stats.column(stat))
+            )
+
+    def _drop(self, key):
+        self.rows.pop(key, None)
+        for stat in STAT_NAMES:
+            self.rankings.pop(key + (stat,), None)
+
+    async def ensure(self, server_id, game_name):
+        # Returns False when the build could not get a usable snapshot; the caller then
+        # serves that request from ranked queries instead.
+        key = self._key(server_id, game_name)
+        if key in self.rows:
+            self.rows.move_to_end(key)
+            return True
+        if self.max_keys <= 0 or await self.db.count_game_stats(server_id, game_name) < self.min_rows:
+            return False
+
+        lock = self.build_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            if key in self.rows:
+                self.rows.move_to_end(key)
+                return True
+
+            try:
+                for _ in range(MAX_BUILD_ATTEMPTS):
+                    # Rows written while the snapshot is read are recorded here and replayed
+                    # over it. invalidate() discards the record, since bulk writes are not in it.
+                    touched = self.building[key] = {}
+                    all_stats = await self.db.get_game_stat_rows(server_id, game_name)
+                    if self.building.get(key) is touched:
+                        break
+                else:
+                    return False
+            finally:
+                self.building.pop(key, None)
+
+            self._load(key, all_stats)
+            for user_id, stats in touched.items():
+                if stats is None:
+                    self._unset(key, user_id)
+                else:
+                    self._set(key, user_id, stats)
+            self.builds += 1
+            while len(self.rows) > self.max_keys:
+                self._drop(next(iter(self.rows)))
+                self.evictions += 1
+            return True
+
+    def _set(self, key, user_id, stats):
+        rows = self.rows[key]
+        previous = rows.get(user_id)
+        for stat in STAT_NAMES:
+            ranking = self.rankings[key + (stat,)]
+            if previous is not None:
+                ranking.remove(rank_key(stat, getattr(previous, stat), user_id))
+            ranking.add(rank_key(stat, getattr(stats, stat), user_id))
+        rows[user_id] = stats
+
+    def _unset(self, key, user_id):
+        previous = self.rows[key].pop(user_id, None)
+        if previous is None:
+            return
+        for stat in STAT_NAMES:
+            self.rankings[key + (stat,)].remove(rank_key(stat, getattr(previous, stat), user_id))
+
+    def apply(self, server_id, user_id, game_name, stats):
+        key = self._key(server_id, game_name)
+        self._bump(key)
+        stats = StatRecord._make(stats)
+        touched = self.building.get(key)
+        if touched is not None:
+            touched[user_id] = stats
+        if key in self.rows:
+            self._set(key, user_id, stats)
+
+    def remove(self, server_id, user_id, game_name):
+        key = self._key(server_id, game_name)
+        self._bump(key)
+        touched = self.building.get(key)
+        if touched is not None:
+            touched[user_id] = None
+        if key in self.rows:
+            self._unset(key, user_id)
+
+    def invalidate(self, server_id=None, game_name=None):
+        keys = [
+            key for key in set(self.rows) | set(self.generations) | set(self.building)
+            if (server_id is None or key[0] == server_id) and (game_name is None or key[1] == game_name)
+        ]
+        for key in keys:
+            self._bump(key)
+            self._drop(key)
+            self.building.pop(key, None)
+
+    def page(self, server_id, game_name, stat, offset=0, limit=10):
+        key = self._key(server_id, game_name)
+        rows = self.rows[key]
+        ranking = self.rankings[key + (stat,)]
+
+        page = [
+            (ranked[-1], getattr(rows[ranked[-1]], stat))
+            for ranked in ranking.islice(offset, offset + limit)
+        ]
+        return page, len(ranking)
+
+    def rank(self, server_id, game_name, stat, user_id):
+        key = self._key(server_id, game_name)
+        stats = self.rows[key].get(user_id)
+        if stats is None:
+            return None
+
+        ranking = self.rankings[key + (stat,)]
+        value = getattr(stats, stat)
+        return ranking.index(rank_key(stat, value, user_id)) + 1, len(ranking), value
+
+    async def verify(self, server_id, game_name):
+        key = self._key(server_id, game_name)
+        if key not in self.rows:
+            return []
+
+        generation = self.generations.get(key, 0)
+        all_stats = await self.db.get_game_stat_rows(server_id, game_name)
+        if self.generations.get(key, 0) != generation:
+            return []
+
+        stored = dict(all_stats.items())
+        indexed = self.rows.get(key, {})
+
+        mismatches = sorted(
+            user_id for user_id in set(stored) | set(indexed)
+            if stored.get(user_id) != indexed.get(user_id)
+        )
+        if mismatches:
+            print(f"Leaderboard index for {key} diverged from the database on {len(mismatches)} rows, rebuilding")
+            self._bump(key)
+            self._load(key, all_stats)
+        return mismatches
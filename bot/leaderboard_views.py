@@ -3,6 +3,7 @@ import discord
 from discord import Interaction
 import discord.ui as ui
 from bot.edit_stats_views import GAME_OPTIONS, get_game_name
+from bot.db_cache import MISSING
 
 STAT_DISPLAY_MAP = {
 	'kills': '⚔️ Kills',
@@ -36,6 +37,9 @@ def format_stat_value(stat, value):
 	else:
 		return f"**`{value:,}`**"
 
+LEADERBOARD_BUTTON_ID = 'leaderboard:{action}:{author_id}:{game}:{stat}:{page}'
+LEADERBOARD_SELECT_ID = 'leaderboard:game:{author_id}:{stat}'
+
 def get_medal_emoji(position):
 	if position == 1:
 		return "🥇"
@@ -46,70 +50,85 @@ def get_medal_emoji(position):
 	else:
 		return f"{position}."
 
-def sort_stats(stats, stat):
-	if stat in ['deaths', 'losses']:
-		def sort_key(x):
-			user_id, stat_value = x
-			if stat_value == 0:
-				return float('inf')
-			return stat_value
-		return sorted(stats, key=sort_key)
-	else:
-		return sorted(stats, key=lambda x: x[1], reverse=True)
-
 class LeaderboardView(ui.LayoutView):
 	def __init__(self, db, bot, game, stat, guild_id, **kwargs):
-		super().__init__(timeout=kwargs.get('timeout', 300))
+		super().__init__(timeout=None)
 		self.db = db
 		self.bot = bot
 		self.game = game
 		self.stat = stat
 		self.guild_id = guild_id
-		self.author_id = kwargs.get('author_id')
-		self.current_page = 0
-		self.pages = []
+		self.author_id = kwargs.get('author_id') or 0
+		self.current_page = kwargs.get('page', 0)
+		self.page_header = None
+		self.page_text = None
+		self.total_players = 0
 		self.max_pages = 0
 		self.players_per_page = 10
 
 	async def setup_pages(self):
-		all_stats = await self.db.get_stats(self.guild_id, game_name=self.game)
-
-		if not all_stats:
-			self.pages = [None]
-			self.max_pages = 1
-			return
-
-		stat_indices = {
-			'tournaments_played': 1,
-			'tournaments_won': 2, 
-			'earnings': 3,
-			'kills': 4,
-			'deaths': 5,
-			'kd': 6,
-			'wins': 7,
-			'losses': 8,
-			'wl': 9
-		}
-
-		processed_stats = []
-		stat_index = stat_indices.get(self.stat, 1)
-
-		for row in all_stats:
-			user_id = row[0]
-			stat_value = row[stat_index]
-			processed_stats.append((user_id, stat_value))
-
-		sorted_stats = sort_stats(processed_stats, self.stat)
-
-		pages = []
-		for i in range(0, len(sorted_stats), self.players_per_page):
-			page_stats = sorted_stats[i:i + self.players_per_page]
-			pages.append(page_stats)
-
-		self.pages = pages
-		self.max_pages = len(self.pages)
-
-	def create_leaderboard_container(self, page_stats=None):
+		version = self.db.stats_version(self.guild_id, self.game)
+		cache_key = (self.guild_id, self.game, self.stat, self.current_page, self.players_per_page, version)
+		cached = self.db.page_cache.get(cache_key)
+
+		if cached is MISSING:
+			offset = self.current_page * self.players_per_page
+			page_stats, total_players = await self.db.get_leaderboard_page(
+				self.guild_id,
+				self.game,
+				self.stat,
+				offset=offset,
+				limit=self.players_per_page
+			)
+			if page_stats:
+				stored_names = await self.stored_display_names(page_stats)
+				page_header, page_text = self.render_page_text(page_stats, total_players, stored_names)
+			else:
+				page_header, page_text = None, None
+			cached = (page_header, page_text, total_players)
+			self.db.page_cache.set(cache_key, cached)
+
+		self.page_header, self.page_text, self.total_players = cached
+		self.max_pages = max(1, -(-self.total_players // self.players_per_page))
+
+		if self.current_page >= self.max_pages:
+			self.current_page = self.max_pages - 1
+			await self.setup_pages()
+
+	def cached_display_name(self, guild, user_id):
+		user = self.bot.get_user(int(user_id))
+		if not user and guild:
+			user = guild.get_member(int(user_id))
+		return user.display_name if user else None
+
+	async def stored_display_names(self, page_stats):
+		guild = self.bot.get_guild(self.guild_id)
+		missing = [user_id for user_id, _ in page_stats if self.cached_display_name(guild, user_id) is None]
+		return await self.db.get_display_names(self.guild_id, missing) if missing else {}
+
+	def render_page_text(self, page_stats, total_players, stored_names=None):
+		stored_names = stored_names or {}
+		guild = self.bot.get_guild(self.guild_id)
+		start_position = self.current_page * self.players_per_page + 1
+		end_position = min(start_position + len(page_stats) - 1, total_players)
+		page_header = f"## 📈 Players {start_position}-{end_position} of {total_players}"
+
+		leaderboard_text = ""
+		for idx, (user_id, stat_value) in enumerate(page_stats):
+			position = start_position + idx
+			medal = get_medal_emoji(position)
+			value_display = format_stat_value(self.stat, stat_value)
+
+			user_display = (
+				self.cached_display_name(guild, user_id)
+				or stored_names.get(int(user_id))
+				or f"User {user_id}"
+			)
+			leaderboard_text += f"{medal} **{user_display}** - {value_display}\n"
+
+		return page_header, leaderboard_text
+
+	def create_leaderboard_container(self, page_text=None):
 		game_name = get_game_name(self.game)
 		stat_name = STAT_DISPLAY_MAP.get(self.stat, self.stat)
 
@@ -118,48 +137,36 @@ class LeaderboardView(ui.LayoutView):
 		container.add_item(header)
 		container.add_item(ui.Separator(spacing=discord.SeparatorSpacing.large))
 
-		if page_stats is None:
+		if page_text is None:
 			container.add_item(ui.TextDisplay(f"## ❌ No Data Available\n-# No data found for {stat_name} in {game_name}"))
 		else:
-			total_players = sum(len(page) for page in self.pages)
-			start_position = self.current_page * self.players_per_page + 1
-			end_position = min(start_position + len(page_stats) - 1, total_players)
-
-			container.add_item(ui.TextDisplay(f"## 📈 Players {start_position}-{end_position} of {total_players}"))
-
-			guild = self.bot.get_guild(self.guild_id)
-			start_position = self.current_page * self.players_per_page + 1
-
-			leaderboard_text = ""
-			for idx, (user_id, stat_value) in enumerate(page_stats):
-				position = start_position + idx
-				medal = get_medal_emoji(position)
-				value_display = format_stat_value(self.stat, stat_value)
-
-				user = self.bot.get_user(int(user_id))
-				if not user and guild:
-					user = guild.get_member(int(user_id))
-
-				user_display = user.display_name if user else f"User {user_id}"
-				leaderboard_text += f"{medal} **{user_display}** - {value_display}\n"
-
-			container.add_item(ui.TextDisplay(leaderboard_text))
+			container.add_item(ui.TextDisplay(self.page_header))
+			container.add_item(ui.TextDisplay(page_text))
 
 		container.add_item(ui.Separator(spacing=discord.SeparatorSpacing.large))
 
 		if self.max_pages > 1:
 			nav_row = ui.ActionRow()
 			if self.current_page > 0:
-				nav_row.add_item(PreviousButton())
-			nav_row.add_item(PageIndicatorButton(self.current_page + 1, self.max_pages))
+				nav_row.add_item(self.button('prev', self.stat, self.current_page - 1, label="◀️ Previous"))
+			nav_row.add_item(self.button(
+				'page',
+				self.stat,
+				self.current_page,
+				label=f"Page {self.current_page + 1}/{self.max_pages}",
+				style=discord.ButtonStyle.primary,
+				disabled=True
+			))
 			if self.current_page < self.max_pages - 1:
-				nav_row.add_item(NextButton())
+				nav_row.add_item(self.button('next', self.stat, self.current_page + 1, label="Next ▶️"))
 			container.add_item(nav_row)
 
 		container.add_item(ui.Separator(spacing=discord.SeparatorSpacing.large))
 
 		container.add_item(ui.TextDisplay("## 🎮 Game Selection"))
-		container.add_item(GameSelectDropdown(self.db, self))
+		game_row = ui.ActionRow()
+		game_row.add_item(LeaderboardGameSelect(self.author_id, self.stat))
+		container.add_item(game_row)
 
 		container.add_item(ui.Separator(spacing=discord.SeparatorSpacing.large))
 
@@ -170,7 +177,7 @@ class LeaderboardView(ui.LayoutView):
 			for j in range(3):
 				if i + j < len(STAT_BUTTONS_CONFIG):
 					stat_name, emoji, label = STAT_BUTTONS_CONFIG[i + j]
-					stat_row.add_item(StatButton(stat_name, emoji, label, self))
+					stat_row.add_item(self.button('stat', stat_name, 0, label=label, emoji=emoji))
 			container.add_item(stat_row)
 
 		footer_text = "🎮 Leaderboard • Updated in real-time"
@@ -182,102 +189,119 @@ class LeaderboardView(ui.LayoutView):
 
 		return container
 
+	def button(self, action, stat, page, **kwargs):
+		return LeaderboardButton(action, self.author_id, self.game, stat, page, **kwargs)
+
 	async def update_page(self, interaction: Interaction):
-		page_stats = self.pages[self.current_page] if self.pages and self.current_page < len(self.pages) else None
-		container = self.create_leaderboard_container(page_stats)
+		if not interaction.response.is_done():
+			await interaction.response.defer()
+		await self.setup_pages()
+		container = self.create_leaderboard_container(self.page_text)
 		
 		self.clear_items()
 		self.add_item(container)
 		
-		await interaction.response.edit_message(view=self)
+		await interaction.edit_original_response(view=self)
 
 	async def update_leaderboard_data(self, interaction: Interaction):
-		await self.setup_pages()
 		self.current_page = 0
-		page_stats = self.pages[self.current_page] if self.pages and self.current_page < len(self.pages) else None
-		container = self.create_leaderboard_container(page_stats)
-		
-		self.clear_items()
-		self.add_item(container)
-		
-		await interaction.response.edit_message(view=self)
-
-	async def interaction_check(self, interaction: Interaction) -> bool:
-		if not self.author_id:
-			return True
-
-		if self.author_id != interaction.user.id:
-			await interaction.response.send_message("You cannot interact with this menu.", ephemeral=True)
-			return False
-
-		return True
+		await self.update_page(interaction)
 
 	async def start(self, interaction: Interaction):
+		if not interaction.response.is_done():
+			await interaction.response.defer()
 		await self.setup_pages()
-		page_stats = self.pages[self.current_page] if self.pages and self.current_page < len(self.pages) else None
-		container = self.create_leaderboard_container(page_stats)
+		container = self.create_leaderboard_container(self.page_text)
 		
 		self.clear_items()
 		self.add_item(container)
 		
-		await interaction.response.send_message(view=self)
-
-class PreviousButton(ui.Button):
-	def __init__(self):
-		super().__init__(label="◀️ Previous", style=discord.ButtonStyle.secondary)
-
-	async def callback(self, interaction: Interaction):
-		view = self.view
-		if view.current_page > 0:
-			view.current_page -= 1
-			await view.update_page(interaction)
+		await interaction.followup.send(view=self)
 
-class NextButton(ui.Button):
-	def __init__(self):
-		super().__init__(label="Next ▶️", style=discord.ButtonStyle.secondary)
+async def check_leaderboard_author(author_id, interaction: Interaction) -> bool:
+	if not author_id or author_id == interaction.user.id:
+		return True
 
-	async def callback(self, interaction: Interaction):
-		view = self.view
-		if view.current_page < view.max_pages - 1:
-			view.current_page += 1
-			await view.update_page(interaction)
+	await interaction.response.send_message("You cannot interact with this menu.", ephemeral=True)
+	return False
+
+class LeaderboardButton(ui.DynamicItem[ui.Button], template=r'leaderboard:(?P<action>prev|next|page|stat):(?P<author_id>\d+):(?P<game>\w+):(?P<stat>\w+):(?P<page>\d+)'):
+	def __init__(self, action, author_id, game, stat, page, label=None, emoji=None, style=discord.ButtonStyle.secondary, disabled=False):
+		super().__init__(ui.Button(
+			label=label,
+			emoji=emoji,
+			style=style,
+			disabled=disabled,
+			custom_id=LEADERBOARD_BUTTON_ID.format(action=action, author_id=author_id, game=game, stat=stat, page=page)
+		))
+		self.action = action
+		self.author_id = author_id
+		self.game = game
+		self.stat = stat
+		self.page = page
+
+	@classmethod
+	async def from_custom_id(cls, interaction: Interaction, item: ui.Button, match):
+		return cls(
+			match['action'],
+			int(match['author_id']),
+			match['game'],
+			match['stat'],
+			int(match['page']),
+			label=item.label,
+			emoji=item.emoji,
+			style=item.style,
+			disabled=item.disabled
+		)
 
-class PageIndicatorButton(ui.Button):
-	def __init__(self, current, total):
-		super().__init__(label=f"Page {current}/{total}", style=discord.ButtonStyle.primary, disabled=True)
+	async def interaction_check(self, interaction: Interaction) -> bool:
+		return await check_leaderboard_author(self.author_id, interaction)
 
 	async def callback(self, interaction: Interaction):
-		await interaction.response.defer()
-
-class StatButton(ui.Button):
-	def __init__(self, stat_name, emoji, label, parent_view):
-		super().__init__(label=label, style=discord.ButtonStyle.secondary, emoji=emoji)
-		self.stat_name = stat_name
-		self.parent_view = parent_view
+		if self.action == 'page':
+			await interaction.response.defer()
+			return
 
-	async def callback(self, interaction: Interaction):
-		self.parent_view.stat = self.stat_name
-		await self.parent_view.update_leaderboard_data(interaction)
+		view = LeaderboardView(
+			interaction.client.db,
+			interaction.client,
+			self.game,
+			self.stat,
+			interaction.guild_id,
+			author_id=self.author_id,
+			page=self.page
+		)
+		await view.update_page(interaction)
 
-class GameSelectDropdown(ui.ActionRow):
-	def __init__(self, db, parent_view):
-		super().__init__()
-		self.db = db
-		self.parent_view = parent_view
-		
-		select = ui.Select(
+class LeaderboardGameSelect(ui.DynamicItem[ui.Select], template=r'leaderboard:game:(?P<author_id>\d+):(?P<stat>\w+)'):
+	def __init__(self, author_id, stat):
+		super().__init__(ui.Select(
 			placeholder="Choose a different game",
 			options=GAME_OPTIONS,
 			min_values=1,
-			max_values=1
-		)
-		select.callback = self.select_game_callback
-		self.add_item(select)
+			max_values=1,
+			custom_id=LEADERBOARD_SELECT_ID.format(author_id=author_id, stat=stat)
+		))
+		self.author_id = author_id
+		self.stat = stat
 
-	async def select_game_callback(self, interaction: Interaction):
-		select = interaction.data['values'][0]
-		self.parent_view.game = select
-		await self.parent_view.update_leaderboard_data(interaction)
+	@classmethod
+	async def from_custom_id(cls, interaction: Interaction, item: ui.Select, match):
+		return cls(int(match['author_id']), match['stat'])
+
+	async def interaction_check(self, interaction: Interaction) -> bool:
+		return await check_leaderboard_author(self.author_id, interaction)
+
+	async def callback(self, interaction: Interaction):
+		view = LeaderboardView(
+			interaction.client.db,
+			interaction.client,
+			self.item.values[0],
+			self.stat,
+			interaction.guild_id,
+			author_id=self.author_id
+		)
+		await view.update_page(interaction)
 
 LeaderboardPaginator = LeaderboardView
 ContainerPaginator = LeaderboardView
\ No newline at end of file
@@ -0,0 +1,133 @@
+import asyncio
+import time
+
+class MemberLifecyclePipeline:
+    def __init__(self, db, flush_interval=1.0, max_batch=500, max_queue=10000):
+        self.db = db
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.pending = {}
+        self.flush_lock = asyncio.Lock()
+        self.task = None
+        self.closed = False
+        self.received = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.flushed_joins = 0
+        self.flushed_leaves = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+
+    def _ensure_task(self):
+        if self.task is None and not self.closed:
+            self.task = asyncio.create_task(self._run())
+
+    async def join(self, server_id, user_id, display_name, games):
+        await self._put(('join', server_id, user_id, display_name, tuple(games)))
+
+    async def leave(self, server_id, user_id, user_name, display_name):
+        await self._put(('leave', server_id, user_id, user_name, display_name))
+
+    async def _put(self, event):
+        self._ensure_task()
+        self.received += 1
+        # Blocks the calling event handler while the queue is full.
+        await self.queue.put(event)
+
+    def _absorb(self, event):
+        kind, server_id, user_id, *details = event
+        key = (server_id, user_id)
+        previous = self.pending.get(key)
+        if previous is not None:
+            self.coalesced += 1
+
+        if kind == 'join':
+            # A join after a leave is kept: it refreshes the display name and repairs missing
+            # stat rows. It remembers the leave in case the member leaves again.
+            rejoined = previous is not None and (previous[0] == 'leave' or previous[-1])
+            self.pending[key] = ('join', *details, rejoined)
+        elif previous is not None and previous[0] == 'join' and not previous[-1]:
+            # A join followed by a leave cancels out: the member was never here.
+            del self.pending[key]
+            self.coalesced += 1
+        else:
+            self.pending[key] = ('leave', *details)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # A failed flush leaves its batch pending, so it is retried after the
+            # interval even if no further events arrive.
+            if not self.pending:
+                self._absorb(await self.queue.get())
+            deadline = loop.time() + self.flush_interval
+            while len(self.pending) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    self._absorb(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Error flushing member lifecycle queue: {e}")
+
+    async def flush(self):
+        async with self.flush_lock:
+            if not self.pending:
+                return
+
+            batch, self.pending = self.pending, {}
+            joins = {}
+            leaves = []
+            for (server_id, user_id), (kind, *details) in batch.items():
+                if kind == 'join':
+                    display_name, games, _ = details
+                    joins.setdefault(games, []).append((server_id, user_id, display_name))
+                else:
+                    user_name, display_name = details
+                    leaves.append((server_id, user_id, user_name, display_name))
+
+            start = time.perf_counter()
+            try:
+                for games, members in joins.items():
+                    await self.db.init_members(members, games)
+                if leaves:
+                    await self.db.players_left(leaves)
+            except Exception:
+                self.pending = {**batch, **self.pending}
+                raise
+
+            self.flushes += 1
+            self.flushed_joins += sum(len(members) for members in joins.values())
+            self.flushed_leaves += len(leaves)
+            self.last_flush_ms = (time.perf_counter() - start) * 1000
+            self.max_flush_ms = max(self.max_flush_ms, self.last_flush_ms)
+
+    async def close(self):
+        self.closed = True
+        if self.task is not None:
+            async with self.flush_lock:
+                self.task.cancel()
+            self.task = None
+        while not self.queue.empty():
+            self._absorb(self.queue.get_nowait())
+        await self.flush()
+
+    def stats(self):
+        return {
+            'queue_depth': self.queue.qsize(),
+            'queue_capacity': self.queue.maxsize,
+            'pending': len(self.pending),
+            'received': self.received,
+            'coalesced': self.coalesced,
+            'flushes': self.flushes,
+            'flushed_joins': self.flushed_joins,
+            'flushed_leaves': self.flushed_leaves,
+            'last_flush_ms': self.last_flush_ms,
+            'max_flush_ms': self.max_flush_ms
+        }
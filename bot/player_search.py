@@ -0,0 +1,102 @@
+import heapq
+
+NGRAM_SIZE = 3
+
+def ngrams(text):
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+class PlayerSearchIndex:
+    def __init__(self):
+        self.entries = {}
+        self.postings = {}
+        self.building = {}
+
+    def is_loaded(self, server_id):
+        return server_id in self.entries
+
+    async def load(self, server_id, players):
+        # Rows written while players is being read are recorded here and replayed over it,
+        # so a leave or rejoin during the read is not lost.
+        touched = self.building[server_id] = {}
+        try:
+            loaded = [player async for player in players]
+        finally:
+            if self.building.get(server_id) is touched:
+                del self.building[server_id]
+            else:
+                touched = None
+        if touched is None:
+            return
+
+        self.entries[server_id] = {}
+        self.postings[server_id] = {}
+        for user_id, user_name, display_name in loaded:
+            self.add(server_id, user_id, user_name, display_name)
+        for user_id, player in touched.items():
+            if player is None:
+                self.remove(server_id, user_id)
+            else:
+                self.add(server_id, user_id, *player)
+
+    def add(self, server_id, user_id, user_name, display_name):
+        touched = self.building.get(server_id)
+        if touched is not None:
+            touched[user_id] = (user_name, display_name)
+        entries = self.entries.get(server_id)
+        if entries is None:
+            return
+
+        self.remove(server_id, user_id)
+        search_text = f"{user_name} {display_name}".lower()
+        entries[user_id] = (user_name, display_name, search_text)
+        postings = self.postings[server_id]
+        for gram in ngrams(search_text):
+            postings.setdefault(gram, set()).add(user_id)
+
+    def remove(self, server_id, user_id):
+        touched = self.building.get(server_id)
+        if touched is not None:
+            touched[user_id] = None
+        entries = self.entries.get(server_id)
+        if entries is None:
+            return
+
+        entry = entries.pop(user_id, None)
+        if entry is None:
+            return
+        postings = self.postings[server_id]
+        for gram in ngrams(entry[2]):
+            user_ids = postings.get(gram)
+            if user_ids is not None:
+                user_ids.discard(user_id)
+                if not user_ids:
+                    del postings[gram]
+
+    def invalidate(self, server_id=None):
+        if server_id is None:
+            self.entries.clear()
+            self.postings.clear()
+            self.building.clear()
+            return
+        self.entries.pop(server_id, None)
+        self.postings.pop(server_id, None)
+        self.building.pop(server_id, None)
+
+    def search(self, server_id, query, limit=25):
+        entries = self.entries.get(server_id, {})
+        query = query.lower()
+
+        if len(query) < NGRAM_SIZE:
+            candidates = entries.keys()
+        else:
+            postings = self.postings.get(server_id, {})
+            posting_sets = sorted((postings.get(gram, set()) for gram in ngrams(query)), key=len)
+            candidates = set.intersection(*posting_sets) if posting_sets[0] else set()
+
+        matches = []
+        for user_id in candidates:
+            user_name, display_name, search_text = entries[user_id]
+            if query in search_text:
+                matches.append((user_id, user_name, display_name))
+
+        return heapq.nsmallest(limit, matches, key=lambda player: (player[2].lower(), player[1].lower()))
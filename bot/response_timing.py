@@ -0,0 +1,53 @@
+from collections import deque
+import time
+
+class ResponseTimer:
+    def __init__(self, timings, command):
+        self.timings = timings
+        self.command = command
+        self.start = time.perf_counter()
+        self.ack = None
+
+    async def defer(self, interaction, **kwargs):
+        await interaction.response.defer(**kwargs)
+        self.ack = time.perf_counter() - self.start
+
+    def finish(self):
+        fulfil = time.perf_counter() - self.start
+        self.timings.record(self.command, fulfil if self.ack is None else self.ack, fulfil)
+
+class ResponseTimings:
+    def __init__(self, samples=256):
+        self.samples = samples
+        self.commands = {}
+
+    def start(self, command):
+        return ResponseTimer(self, command)
+
+    def record(self, command, ack, fulfil):
+        entry = self.commands.get(command)
+        if entry is None:
+            entry = self.commands[command] = {
+                'count': 0,
+                'ack': deque(maxlen=self.samples),
+                'fulfil': deque(maxlen=self.samples)
+            }
+        entry['count'] += 1
+        entry['ack'].append(ack)
+        entry['fulfil'].append(fulfil)
+
+    def stats(self):
+        def percentile(samples, fraction):
+            ordered = sorted(samples)
+            return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1000
+
+        return {
+            command: {
+                'count': entry['count'],
+                'ack_p50_ms': percentile(entry['ack'], 0.5),
+                'ack_p95_ms': percentile(entry['ack'], 0.95),
+                'fulfil_p50_ms': percentile(entry['fulfil'], 0.5),
+                'fulfil_p95_ms': percentile(entry['fulfil'], 0.95)
+            }
+            for command, entry in self.commands.items()
+        }
@@ -0,0 +1,355 @@
+import sqlite3
+import threading
+import time
+from bot.stats import STAT_COUNTERS, STAT_NAMES, ASCENDING_STATS, DERIVED_STATS, SORT_COLUMNS, sort_column
+from bot.storage import StorageBackend, BULK_CHUNK_SIZE, SELECT_PAGE_SIZE
+
+def ratio(numerator, denominator):
+    return f"case when {denominator} > 0 then cast({numerator} as real) / {denominator} else 0.0 end"
+
+SCHEMA = f"""
+create table if not exists game_stats (
+    server_id integer not null,
+    user_id integer not null,
+    game_name text not null,
+    {', '.join(f'{stat_name} integer not null default 0' for stat_name in STAT_COUNTERS)},
+    {', '.join(
+        f'{stat_name} real generated always as ({ratio(numerator, denominator)}) stored'
+        for stat_name, (numerator, denominator) in DERIVED_STATS.items()
+    )},
+    {', '.join(
+        f'{rank_column} integer generated always as (nullif({stat_name}, 0)) stored'
+        for stat_name, rank_column in SORT_COLUMNS.items()
+    )},
+    primary key (server_id, user_id, game_name)
+);
+
+create table if not exists user_profiles (
+    server_id integer not null,
+    user_id integer not null,
+    display_name text not null default '',
+    gaming_bio text not null default '',
+    main_game text not null default 'r6s',
+    social_links text not null default '{{}}',
+    embed_color text not null default '0x00d4ff',
+    timezone text not null default 'UTC',
+    team_affiliation text not null default '',
+    bf6_favorite_class text not null default '',
+    r6s_role text not null default '',
+    r6s_favorite_operator text not null default '',
+    primary key (server_id, user_id)
+);
+
+create table if not exists player_left (
+    server_id integer not null,
+    user_id integer not null,
+    user_name text not null default '',
+    display_name text not null default '',
+    primary key (server_id, user_id)
+);
+
+create table if not exists guild_bootstrap (
+    server_id integer primary key,
+    shard_id integer not null,
+    cluster_id text not null,
+    members integer,
+    claimed_at real not null
+);
+
+{''.join(
+    f'create index if not exists game_stats_rank_{stat_name}_idx on game_stats (server_id, game_name, {sort_column(stat_name)}, user_id);'
+    for stat_name in ASCENDING_STATS
+)}
+
+-- Descending stats rank "stat desc, user_id asc", which a backwards scan of an
+-- ascending index cannot produce. The old ascending indexes are dropped.
+{''.join(
+    f'drop index if exists game_stats_rank_{stat_name}_idx;'
+    f'create index if not exists game_stats_rank_{stat_name}_desc_idx on game_stats (server_id, game_name, {stat_name} desc, user_id);'
+    for stat_name in STAT_NAMES if stat_name not in ASCENDING_STATS
+)}
+"""
+
+INCREMENT_SQL = f"""
+insert into game_stats (server_id, user_id, game_name, {', '.join(STAT_COUNTERS)})
+values (:server_id, :user_id, :game_name, {', '.join(f':{stat_name}' for stat_name in STAT_COUNTERS)})
+on conflict (server_id, user_id, game_name) do update set
+    {', '.join(f'{stat_name} = {stat_name} + excluded.{stat_name}' for stat_name in STAT_COUNTERS)}
+returning server_id, user_id, game_name, {', '.join(STAT_COUNTERS)}, cast(kd as real) as kd, cast(wl as real) as wl
+"""
+
+CLAIM_BOOTSTRAP_SQL = """
+insert into guild_bootstrap (server_id, shard_id, cluster_id, members, claimed_at)
+values (:server_id, :shard_id, :cluster_id, null, :now)
+on conflict (server_id) do update set
+    shard_id = excluded.shard_id,
+    cluster_id = excluded.cluster_id,
+    members = null,
+    claimed_at = excluded.claimed_at
+where guild_bootstrap.claimed_at < :now - :stale_after
+returning server_id
+"""
+
+RESET_STATS_SQL = f"""
+insert into game_stats (server_id, user_id, game_name) values (?, ?, ?)
+on conflict (server_id, user_id, game_name) do update set
+    {', '.join(f'{stat_name} = 0' for stat_name in STAT_COUNTERS)}
+returning server_id, user_id, game_name, {', '.join(STAT_COUNTERS)}, cast(kd as real) as kd, cast(wl as real) as wl
+"""
+
+class SQLiteBackend(StorageBackend):
+    name = 'sqlite'
+
+    def __init__(self, path='gamestats.db', max_workers=8):
+        super().__init__(max_workers=max_workers)
+        self.path = path
+        self.local = threading.local()
+        self.connections = []
+        self.connections_lock = threading.Lock()
+
+    def _connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False, timeout=5.0)
+            connection.row_factory = sqlite3.Row
+            connection.execute('pragma journal_mode=wal')
+            connection.execute('pragma synchronous=normal')
+            self.local.connection = connection
+            with self.connections_lock:
+                self.connections.append(connection)
+        return connection
+
+    def _fetch(self, sql, params=()):
+        return [dict(row) for row in self._connection().execute(sql, params).fetchall()]
+
+    def _transaction(self, work):
+        connection = self._connection()
+        connection.execute('begin immediate')
+        try:
+            result = work(connection)
+        except BaseException:
+            connection.execute('rollback')
+            raise
+        connection.execute('commit')
+        return result
+
+    def _where(self, server_id, filters):
+        clauses = ['server_id = ?'] + [f'{column} = ?' for column in filters]
+        return ' and '.join(clauses), [server_id, *filters.values()]
+
+    def _create_schema(self):
+        connection = self._connection()
+        connection.executescript(SCHEMA)
+        profile_columns = {row['name'] for row in connection.execute('pragma table_info(user_profiles)')}
+        if 'display_name' not in profile_columns:
+            connection.execute("alter table user_profiles add column display_name text not null default ''")
+
+    async def initialize(self):
+        await self._run(self._create_schema)
+        print(f"Database connection established with SQLite ({self.path})")
+
+    async def close(self):
+        await super().close()
+        with self.connections_lock:
+            for connection in self.connections:
+                connection.close()
+            self.connections.clear()
+
+    async def select(self, table, columns, server_id, **filters):
+        where, params = self._where(server_id, filters)
+        return await self._run(self._fetch, f'select {columns} from {table} where {where}', params)
+
+    async def count_rows(self, table, server_id, **filters):
+        where, params = self._where(server_id, filters)
+        rows = await self._run(self._fetch, f'select count(*) as total from {table} where {where}', params)
+        return rows[0]['total']
+
+    async def select_in(self, table, columns, server_id, column, values):
+        values = list(values)
+        sql = f"select {columns} from {table} where server_id = ? and {column} in ({', '.join('?' for _ in values)})"
+        return await self._run(self._fetch, sql, [server_id, *values])
+
+    async def iter_rows(self, table, columns, server_id, page_size=SELECT_PAGE_SIZE, keyset=('user_id',), **filters):
+        where, params = self._where(server_id, filters)
+        order = ', '.join(keyset)
+        first_sql = f'select {columns} from {table} where {where} order by {order} limit ?'
+        next_sql = f"select {columns} from {table} where {where} and ({order}) > ({', '.join('?' for _ in keyset)}) order by {order} limit ?"
+        rows = await self._run(self._fetch, first_sql, [*params, page_size])
+        while True:
+            if rows:
+                yield rows
+            if len(rows) < page_size:
+                return
+            bound = [rows[-1][column] for column in keyset]
+            rows = await self._run(self._fetch, next_sql, [*params, *bound, page_size])
+
+    async def insert_missing(self, table, rows, on_conflict, chunk_size=BULK_CHUNK_SIZE):
+        if not rows:
+            return 0
+
+        columns = list(rows[0])
+        sql = (
+            f"insert into {table} ({', '.join(columns)}) values ({', '.join('?' for _ in columns)}) "
+            f"on conflict ({', '.join(on_conflict)}) do nothing"
+        )
+
+        def insert_chunk(chunk):
+            return self._transaction(
+                lambda connection: connection.executemany(sql, [[row[column] for column in columns] for row in chunk])
+            )
+
+        for start in range(0, len(rows), chunk_size):
+            await self._run(insert_chunk, rows[start:start + chunk_size])
+        return len(rows)
+
+    async def update(self, table, values, server_id, **filters):
+        where, params = self._where(server_id, filters)
+        sql = f"update {table} set {', '.join(f'{column} = ?' for column in values)} where {where}"
+        await self._run(self._fetch, sql, [*values.values(), *params])
+
+    async def delete(self, table, server_id, **filters):
+        where, params = self._where(server_id, filters)
+        await self._run(self._fetch, f'delete from {table} where {where}', params)
+
+    def _increment_params(self, row):
+        params = {'server_id': row['server_id'], 'user_id': row['user_id'], 'game_name': row['game_name']}
+        for stat_name in STAT_COUNTERS:
+            params[stat_name] = row.get(stat_name, 0)
+        return params
+
+    async def increment_stats(self, server_id, user_id, game_name, deltas):
+        params = self._increment_params({'server_id': server_id, 'user_id': user_id, 'game_name': game_name, **deltas})
+        rows = await self._run(self._fetch, INCREMENT_SQL, params)
+        return rows[0]
+
+    async def increment_stats_batch(self, rows):
+        def increment_all(connection):
+            return [
+                dict(connection.execute(INCREMENT_SQL, self._increment_params(row)).fetchone())
+                for row in rows
+            ]
+
+        return await self._run(self._transaction, increment_all)
+
+    async def ranked_page(self, server_id, game_name, stat, offset, limit, count=True):
+        if stat in ASCENDING_STATS:
+            order = f'{sort_column(stat)} asc nulls last, user_id'
+        else:
+            order = f'{stat} desc, user_id'
+
+        def fetch_page():
+            params = [server_id, game_name]
+            page = self._fetch(
+                f'select user_id, {stat} from game_stats where server_id = ? and game_name = ? order by {order} limit ? offset ?',
+                params + [limit, offset]
+            )
+            if not count:
+                return [(row['user_id'], row[stat]) for row in page], None
+            total = self._fetch('select count(*) as total from game_stats where server_id = ? and game_name = ?', params)
+            return [(row['user_id'], row[stat]) for row in page], total[0]['total']
+
+        return await self._run(fetch_page)
+
+    async def user_rank(self, server_id, game_name, stat, user_id, value):
+        if stat in ASCENDING_STATS and value == 0:
+            ahead = f'{sort_column(stat)} is not null'
+        elif stat in ASCENDING_STATS:
+            ahead = f'{sort_column(stat)} < :value'
+        else:
+            ahead = f'{stat} > :value'
+
+        sql = (
+            f'select count(*) as total, '
+            f'coalesce(sum(({ahead}) or ({stat} = :value and user_id < :user_id)), 0) as ahead '
+            f'from game_stats where server_id = :server_id and game_name = :game_name'
+        )
+        params = {'server_id': server_id, 'game_name': game_name, 'user_id': user_id, 'value': value}
+        rows = await self._run(self._fetch, sql, params)
+        return rows[0]['ahead'] + 1, rows[0]['total']
+
+    async def _ensure(self, table, row, on_conflict):
+        sql = (
+            f"insert into {table} ({', '.join(row)}) values ({', '.join('?' for _ in row)}) "
+            f"on conflict ({', '.join(on_conflict)}) do update set user_id = user_id returning *"
+        )
+        rows = await self._run(self._fetch, sql, list(row.values()))
+        return rows[0]
+
+    async def ensure_profile(self, row):
+        return await self._ensure('user_profiles', row, ('server_id', 'user_id'))
+
+    async def ensure_player_left(self, row):
+        return await self._ensure('player_left', row, ('server_id', 'user_id'))
+
+    async def delete_user_data(self, server_id, user_id):
+        def delete_all(connection):
+            key = (server_id, user_id)
+            connection.execute('delete from user_profiles where server_id = ? and user_id = ?', key)
+            connection.execute('delete from player_left where server_id = ? and user_id = ?', key)
+            rows = connection.execute('delete from game_stats where server_id = ? and user_id = ? returning game_name', key).fetchall()
+            return [row['game_name'] for row in rows]
+
+        return await self._run(self._transaction, delete_all)
+
+    async def reset_stats(self, server_id, user_id, games):
+        def reset_all(connection):
+            return [dict(connection.execute(RESET_STATS_SQL, (server_id, user_id, game_name)).fetchone()) for game_name in games]
+
+        return await self._run(self._transaction, reset_all)
+
+    def _init_member(self, connection, profile, games):
+        columns = list(profile)
+        profile_sql = (
+            f"insert into user_profiles ({', '.join(columns)}) values ({', '.join('?' for _ in columns)}) "
+            f"on conflict (server_id, user_id) do update set display_name = excluded.display_name"
+        )
+        key = (profile['server_id'], profile['user_id'])
+
+        connection.execute('delete from player_left where server_id = ? and user_id = ?', key)
+        connection.executemany(
+            'insert into game_stats (server_id, user_id, game_name) values (?, ?, ?) on conflict do nothing',
+            [key + (game_name,) for game_name in games]
+        )
+        connection.execute(profile_sql, [profile[column] for column in columns])
+        return [
+            dict(row) for row in connection.execute(
+                f"select * from game_stats where server_id = ? and user_id = ? and game_name in ({', '.join('?' for _ in games)})",
+                key + tuple(games)
+            )
+        ]
+
+    async def init_members(self, profiles, games):
+        def init_all(connection):
+            return [row for profile in profiles for row in self._init_member(connection, profile, games)]
+
+        return await self._run(self._transaction, init_all)
+
+    async def set_display_names(self, server_id, names):
+        await self._run(self._transaction, lambda connection: connection.executemany(
+            'update user_profiles set display_name = ? where server_id = ? and user_id = ?',
+            [(name['display_name'], server_id, name['user_id']) for name in names]
+        ))
+
+    async def profile_card(self, server_id, user_id, defaults):
+        columns = list(defaults)
+        insert_sql = (
+            f"insert into user_profiles ({', '.join(columns)}) values ({', '.join('?' for _ in columns)}) "
+            f"on conflict (server_id, user_id) do nothing"
+        )
+
+        def read_card(connection):
+            connection.execute(insert_sql, [defaults[column] for column in columns])
+            profile = dict(connection.execute(
+                'select * from user_profiles where server_id = ? and user_id = ?', (server_id, user_id)
+            ).fetchone())
+            stats = connection.execute(
+                'select * from game_stats where server_id = ? and user_id = ? and game_name = ?',
+                (server_id, user_id, profile['main_game'])
+            ).fetchone()
+            return profile, dict(stats) if stats else None
+
+        return await self._run(self._transaction, read_card)
+
+    async def claim_bootstrap(self, server_id, shard_id, cluster_id, stale_after):
+        params = {'server_id': server_id, 'shard_id': shard_id, 'cluster_id': cluster_id, 'now': time.time(), 'stale_after': stale_after}
+        return bool(await self._run(self._fetch, CLAIM_BOOTSTRAP_SQL, params))
@@ -0,0 +1,105 @@
+from array import array
+from typing import NamedTuple
+
+STAT_COUNTERS = ['tournaments_played', 'tournaments_won', 'earnings', 'kills', 'deaths', 'wins', 'losses']
+STAT_NAMES = ['tournaments_played', 'tournaments_won', 'earnings', 'kills', 'deaths', 'kd', 'wins', 'losses', 'wl']
+DERIVED_STATS = {'kd': ('kills', 'deaths'), 'wl': ('wins', 'losses')}
+ASCENDING_STATS = ['deaths', 'losses']
+SORT_COLUMNS = {stat: f'{stat}_rank' for stat in ASCENDING_STATS}
+
+def ratio(numerator, denominator):
+    return numerator / denominator if denominator > 0 else 0.0
+
+def sort_column(stat):
+    return SORT_COLUMNS.get(stat, stat)
+
+def rank_key(stat, value, user_id):
+    if stat in ASCENDING_STATS:
+        return (value == 0, value, user_id)
+    return (-value, user_id)
+
+class StatRecord(NamedTuple):
+    tournaments_played: int = 0
+    tournaments_won: int = 0
+    earnings: int = 0
+    kills: int = 0
+    deaths: int = 0
+    kd: float = 0.0
+    wins: int = 0
+    losses: int = 0
+    wl: float = 0.0
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(*(row.get(stat_name, 0) for stat_name in STAT_NAMES))
+
+    def add(self, deltas):
+        merged = self._asdict()
+        for stat_name in STAT_COUNTERS:
+            merged[stat_name] += deltas.get(stat_name, 0)
+        for stat_name, (numerator, denominator) in DERIVED_STATS.items():
+            merged[stat_name] = ratio(merged[numerator], merged[denominator])
+        return StatRecord(**merged)
+
+def column_array(column):
+    if column == 'user_id':
+        return array('q')
+    if column in STAT_COUNTERS:
+        return array('q')
+    if column in STAT_NAMES:
+        return array('d')
+    return []
+
+class StatTable:
+    __slots__ = ('key_columns', 'stat_columns', 'columns')
+
+    def __init__(self, key_columns=('user_id',), stat_columns=tuple(STAT_NAMES), columns=None):
+        self.key_columns = tuple(key_columns)
+        self.stat_columns = tuple(stat_columns)
+        self.columns = columns or {column: column_array(column) for column in self.key_columns + self.stat_columns}
+
+    @classmethod
+    def from_rows(cls, rows, key_columns=('user_id',), stat_columns=tuple(STAT_NAMES)):
+        table = cls(key_columns, stat_columns)
+        for row in rows:
+            table.append([row[column] for column in table.key_columns], [row.get(column) or 0 for column in table.stat_columns])
+        return table
+
+    def append(self, keys, values):
+        for column, key in zip(self.key_columns, keys):
+            self.columns[column].append(int(key) if column == 'user_id' else key)
+        for column, value in zip(self.stat_columns, values):
+            self.columns[column].append(value)
+
+    def __len__(self):
+        return len(self.columns[self.key_columns[0]]) if self.key_columns else 0
+
+    def __iter__(self):
+        return zip(*(self.columns[column] for column in self.key_columns + self.stat_columns))
+
+    def __repr__(self):
+        return f"StatTable({list(self)!r})"
+
+    def __eq__(self, other):
+        return isinstance(other, StatTable) and list(self) == list(other)
+
+    def column(self, name):
+        return self.columns[name]
+
+    def keys(self):
+        if len(self.key_columns) == 1:
+            return iter(self.columns[self.key_columns[0]])
+        return zip(*(self.columns[column] for column in self.key_columns))
+
+    def records(self):
+        values = zip(*(self.columns[column] for column in self.stat_columns))
+        if self.stat_columns == tuple(STAT_NAMES):
+            return (StatRecord._make(row) for row in values)
+        return values
+
+    def items(self):
+        return zip(self.keys(), self.records())
+
+    def project(self, stat_columns):
+        columns = {column: self.columns[column] for column in self.key_columns + tuple(stat_columns)}
+        return StatTable(self.key_columns, stat_columns, columns)
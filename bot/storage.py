@@ -0,0 +1,80 @@
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+
+BULK_CHUNK_SIZE = 500
+SELECT_PAGE_SIZE = 1000
+
+class StorageBackend:
+    name = 'storage'
+
+    def __init__(self, max_workers=8):
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f'gamestats-{self.name}')
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def initialize(self):
+        pass
+
+    async def close(self):
+        await asyncio.get_running_loop().run_in_executor(None, self.executor.shutdown)
+
+    async def select(self, table, columns, server_id, **filters):
+        raise NotImplementedError
+
+    async def select_in(self, table, columns, server_id, column, values):
+        raise NotImplementedError
+
+    async def count_rows(self, table, server_id, **filters):
+        raise NotImplementedError
+
+    def iter_rows(self, table, columns, server_id, page_size=SELECT_PAGE_SIZE, keyset=('user_id',), **filters):
+        # Async generator of row pages, keyset on the keyset columns, so filters must make them
+        # unique and columns must include them.
+        raise NotImplementedError
+
+    async def insert_missing(self, table, rows, on_conflict, chunk_size=BULK_CHUNK_SIZE):
+        raise NotImplementedError
+
+    async def update(self, table, values, server_id, **filters):
+        raise NotImplementedError
+
+    async def delete(self, table, server_id, **filters):
+        raise NotImplementedError
+
+    async def increment_stats(self, server_id, user_id, game_name, deltas):
+        raise NotImplementedError
+
+    async def increment_stats_batch(self, rows):
+        raise NotImplementedError
+
+    async def ranked_page(self, server_id, game_name, stat, offset, limit, count=True):
+        raise NotImplementedError
+
+    async def user_rank(self, server_id, game_name, stat, user_id, value):
+        raise NotImplementedError
+
+    async def ensure_profile(self, row):
+        raise NotImplementedError
+
+    async def ensure_player_left(self, row):
+        raise NotImplementedError
+
+    async def delete_user_data(self, server_id, user_id):
+        raise NotImplementedError
+
+    async def reset_stats(self, server_id, user_id, games):
+        raise NotImplementedError
+
+    async def init_members(self, profiles, games):
+        raise NotImplementedError
+
+    async def set_display_names(self, server_id, names):
+        raise NotImplementedError
+
+    async def profile_card(self, server_id, user_id, defaults):
+        raise NotImplementedError
+
+    async def claim_bootstrap(self, server_id, shard_id, cluster_id, stale_after):
+        raise NotImplementedError
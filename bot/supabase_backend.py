@@ -0,0 +1,177 @@
+from supabase import create_client, Client
+import asyncio
+import os
+from bot.stats import STAT_COUNTERS, ASCENDING_STATS, sort_column
+from bot.storage import StorageBackend, BULK_CHUNK_SIZE, SELECT_PAGE_SIZE
+
+class SupabaseBackend(StorageBackend):
+    name = 'supabase'
+
+    def __init__(self, client=None, max_workers=8):
+        if client is None:
+            supabase_url = os.getenv('SUPABASE_URL')
+            supabase_key = os.getenv('SUPABASE_ANON_KEY')
+
+            if not supabase_url or not supabase_key:
+                raise ValueError("SUPABASE_URL and SUPABASE_ANON_KEY environment variables must be set")
+
+            client = create_client(supabase_url, supabase_key)
+
+        super().__init__(max_workers=max_workers)
+        self.supabase: Client = client
+
+    async def initialize(self):
+        print("Database connection established with Supabase")
+
+    async def _execute(self, query):
+        return await self._run(query.execute)
+
+    def _filtered(self, query, server_id, filters):
+        query = query.eq('server_id', server_id)
+        for column, value in filters.items():
+            query = query.eq(column, value)
+        return query
+
+    async def select(self, table, columns, server_id, **filters):
+        result = await self._execute(self._filtered(self.supabase.table(table).select(columns), server_id, filters))
+        return result.data
+
+    async def select_in(self, table, columns, server_id, column, values):
+        result = await self._execute(self._filtered(self.supabase.table(table).select(columns), server_id, {}).in_(column, list(values)))
+        return result.data
+
+    async def count_rows(self, table, server_id, **filters):
+        result = await self._execute(self._filtered(self.supabase.table(table).select('user_id', count='exact', head=True), server_id, filters))
+        return result.count or 0
+
+    async def iter_rows(self, table, columns, server_id, page_size=SELECT_PAGE_SIZE, keyset=('user_id',), **filters):
+        # page_size must not exceed the PostgREST max-rows setting, or a capped page looks like the last one.
+        # A composite bound (a, b) > (x, y) is read as the rest of a = x, then a > x.
+        last = None
+        while True:
+            if last is None:
+                ranges = [({}, None)]
+            else:
+                ranges = [
+                    ({column: last[column] for column in keyset[:depth]}, keyset[depth])
+                    for depth in reversed(range(len(keyset)))
+                ]
+
+            for equal, after in ranges:
+                query = self._filtered(self.supabase.table(table).select(columns), server_id, {**filters, **equal})
+                if after is not None:
+                    query = query.gt(after, last[after])
+                for column in keyset:
+                    query = query.order(column)
+                result = await self._execute(query.limit(page_size))
+                if result.data:
+                    yield result.data
+                if len(result.data) == page_size:
+                    last = result.data[-1]
+                    break
+            else:
+                return
+
+    async def insert_missing(self, table, rows, on_conflict, chunk_size=BULK_CHUNK_SIZE):
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            await self._execute(self.supabase.table(table).upsert(chunk, on_conflict=','.join(on_conflict), ignore_duplicates=True))
+        return len(rows)
+
+    async def update(self, table, values, server_id, **filters):
+        await self._execute(self._filtered(self.supabase.table(table).update(values), server_id, filters))
+
+    async def delete(self, table, server_id, **filters):
+        await self._execute(self._filtered(self.supabase.table(table).delete(), server_id, filters))
+
+    async def increment_stats(self, server_id, user_id, game_name, deltas):
+        params = {
+            'p_server_id': server_id,
+            'p_user_id': user_id,
+            'p_game_name': game_name
+        }
+        for stat_name in STAT_COUNTERS:
+            params[f'p_{stat_name}'] = deltas.get(stat_name, 0)
+
+        result = await self._execute(self.supabase.rpc('increment_game_stats', params))
+        return result.data[0]
+
+    async def increment_stats_batch(self, rows):
+        result = await self._execute(self.supabase.rpc('increment_game_stats_batch', {'p_rows': rows}))
+        return result.data
+
+    def _stat_query(self, server_id, game_name, columns, count='exact', head=None):
+        return self.supabase.table('game_stats').select(columns, count=count, head=head).eq('server_id', server_id).eq('game_name', game_name)
+
+    async def ranked_page(self, server_id, game_name, stat, offset, limit, count=True):
+        query = self._stat_query(server_id, game_name, f'user_id, {stat}', count='exact' if count else None)
+        query = query.order(sort_column(stat), desc=stat not in ASCENDING_STATS, nullsfirst=False).order('user_id')
+        result = await self._execute(query.range(offset, offset + limit - 1))
+        return [(row['user_id'], row[stat]) for row in result.data], (result.count or 0) if count else None
+
+    async def user_rank(self, server_id, game_name, stat, user_id, value):
+        def count_query():
+            return self._stat_query(server_id, game_name, 'user_id', head=True)
+
+        if stat in ASCENDING_STATS and value == 0:
+            ahead = count_query().not_.is_(sort_column(stat), 'null')
+        elif stat in ASCENDING_STATS:
+            ahead = count_query().lt(sort_column(stat), value)
+        else:
+            ahead = count_query().gt(stat, value)
+        tied_ahead = count_query().eq(stat, value).lt('user_id', user_id)
+
+        ahead_result, tied_result, total_result = await asyncio.gather(
+            self._execute(ahead),
+            self._execute(tied_ahead),
+            self._execute(count_query())
+        )
+        return (ahead_result.count or 0) + (tied_result.count or 0) + 1, total_result.count or 0
+
+    async def ensure_profile(self, row):
+        result = await self._execute(self.supabase.rpc('ensure_user_profile', {
+            'p_server_id': row['server_id'],
+            'p_user_id': row['user_id'],
+            'p_display_name': row['display_name']
+        }))
+        return result.data[0]
+
+    async def ensure_player_left(self, row):
+        result = await self._execute(self.supabase.rpc('ensure_player_left', {f'p_{column}': value for column, value in row.items()}))
+        return result.data[0]
+
+    async def delete_user_data(self, server_id, user_id):
+        result = await self._execute(self.supabase.rpc('delete_all_user_data', {'p_server_id': server_id, 'p_user_id': user_id}))
+        return result.data
+
+    async def reset_stats(self, server_id, user_id, games):
+        result = await self._execute(self.supabase.rpc('reset_user_stats', {
+            'p_server_id': server_id,
+            'p_user_id': user_id,
+            'p_games': list(games)
+        }))
+        return result.data
+
+    async def init_members(self, profiles, games):
+        members = [
+            {'server_id': profile['server_id'], 'user_id': profile['user_id'], 'display_name': profile['display_name']}
+            for profile in profiles
+        ]
+        result = await self._execute(self.supabase.rpc('init_members', {'p_members': members, 'p_games': list(games)}))
+        return result.data
+
+    async def set_display_names(self, server_id, names):
+        await self._execute(self.supabase.rpc('set_display_names', {'p_server_id': server_id, 'p_members': names}))
+
+    async def profile_card(self, server_id, user_id, defaults):
+        result = await self._execute(self.supabase.rpc('get_profile_card', {'p_server_id': server_id, 'p_user_id': user_id}))
+        return result.data['profile'], result.data['stats']
+
+    async def claim_bootstrap(self, server_id, shard_id, cluster_id, stale_after):
+        result = await self._execute(self.supabase.rpc('claim_guild_bootstrap', {
+            'p_server_id': server_id,
+            'p_shard_id': shard_id,
+            'p_cluster_id': cluster_id,
+            'p_stale_after_seconds': stale_after
+        }))
+        return bool(result.data)
@@ -0,0 +1,118 @@
+import asyncio
+import time
+from bot.stats import STAT_COUNTERS
+
+class StatWriteQueue:
+    def __init__(self, db, flush_interval=0.5, max_pending=200):
+        self.db = db
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.pending = {}
+        self.flushing = {}
+        self.flush_lock = asyncio.Lock()
+        self.task = None
+        self.closed = False
+        self.queued = 0
+        self.merged = 0
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.last_flush_ms = 0.0
+
+    def _ensure_task(self):
+        if self.task is None and not self.closed:
+            self.task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Error flushing stat write queue: {e}")
+
+    async def add(self, server_id, user_id, game_name, **stats):
+        key = (server_id, user_id, game_name)
+        deltas = self.pending.get(key)
+        if deltas is None:
+            deltas = self.pending[key] = dict.fromkeys(STAT_COUNTERS, 0)
+        else:
+            self.merged += 1
+
+        for stat_name in STAT_COUNTERS:
+            deltas[stat_name] += stats.get(stat_name, 0)
+        self.queued += 1
+
+        if len(self.pending) >= self.max_pending:
+            # The deltas are already queued, so a failed flush must not reach the caller:
+            # a retry there would apply them twice. They stay pending for the next flush.
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Error flushing stat write queue: {e}")
+        self._ensure_task()
+
+    def pending_deltas(self, server_id, user_id, game_name):
+        key = (server_id, user_id, game_name)
+        combined = None
+        for source in (self.flushing, self.pending):
+            deltas = source.get(key)
+            if deltas is None:
+                continue
+            if combined is None:
+                combined = dict.fromkeys(STAT_COUNTERS, 0)
+            for stat_name in STAT_COUNTERS:
+                combined[stat_name] += deltas[stat_name]
+        return combined
+
+    def discard(self, server_id, user_id, game_names=None):
+        for key in [key for key in self.pending if key[:2] == (server_id, user_id)]:
+            if game_names is None or key[2] in game_names:
+                del self.pending[key]
+
+    def pending_games(self, server_id, user_id):
+        prefix = (server_id, user_id)
+        return sorted({key[2] for source in (self.flushing, self.pending) for key in source if key[:2] == prefix})
+
+    async def flush(self):
+        async with self.flush_lock:
+            if not self.pending:
+                return
+
+            batch, self.pending = self.pending, {}
+            self.flushing = batch
+            start = time.perf_counter()
+            try:
+                await self.db.increment_stats_batch([
+                    dict(server_id=server_id, user_id=user_id, game_name=game_name, **deltas)
+                    for (server_id, user_id, game_name), deltas in batch.items()
+                ])
+            except Exception:
+                for key, deltas in batch.items():
+                    merged = self.pending.setdefault(key, dict.fromkeys(STAT_COUNTERS, 0))
+                    for stat_name in STAT_COUNTERS:
+                        merged[stat_name] += deltas[stat_name]
+                raise
+            finally:
+                self.flushing = {}
+
+            self.flushes += 1
+            self.flushed_rows += len(batch)
+            self.last_flush_ms = (time.perf_counter() - start) * 1000
+
+    async def close(self):
+        self.closed = True
+        if self.task is not None:
+            async with self.flush_lock:
+                self.task.cancel()
+            self.task = None
+        await self.flush()
+
+    def stats(self):
+        return {
+            'pending': len(self.pending),
+            'queued': self.queued,
+            'merged': self.merged,
+            'flushes': self.flushes,
+            'flushed_rows': self.flushed_rows,
+            'last_flush_ms': self.last_flush_ms
+        }
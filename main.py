@@ -4,11 +4,38 @@ import os
 import logging
 from dotenv import load_dotenv
 import random
+import socket
 from bot.database import GameStatsDatabase
+from bot.response_timing import ResponseTimings
 
 load_dotenv()
 
-intents = discord.Intents.all()
+def client_options():
+    profile = os.getenv('INTENTS_PROFILE', 'lean')
+    if profile == 'full':
+        return {'command_prefix': '!', 'intents': discord.Intents.all()}
+    if profile != 'lean':
+        raise ValueError(f"Unknown INTENTS_PROFILE: {profile}")
+
+    # Members for join/leave events and bootstrap; no presences or message bodies.
+    # Only members seen joining are cached, everything else is chunked on demand
+    # or resolved from the display names stored on user_profiles. Leaves are read
+    # from the raw remove event, and renames are only seen for cached members.
+    intents = discord.Intents.default()
+    intents.members = True
+    intents.presences = False
+    intents.message_content = False
+
+    member_cache_flags = discord.MemberCacheFlags.none()
+    member_cache_flags.joined = True
+
+    return {
+        'command_prefix': commands.when_mentioned_or('!'),
+        'intents': intents,
+        'member_cache_flags': member_cache_flags,
+        'chunk_guilds_at_startup': False,
+        'max_messages': None
+    }
 
 logging.basicConfig(
     level=logging.ERROR,
@@ -19,10 +46,22 @@ logging.basicConfig(
     ]
 )
 
-class MyBot(commands.Bot):
+def shard_options():
+    options = {}
+    if os.getenv('SHARD_COUNT'):
+        options['shard_count'] = int(os.getenv('SHARD_COUNT'))
+    if os.getenv('SHARD_IDS'):
+        if 'shard_count' not in options:
+            raise ValueError("SHARD_IDS requires SHARD_COUNT to be set")
+        options['shard_ids'] = [int(shard_id) for shard_id in os.getenv('SHARD_IDS').split(',')]
+    return options
+
+class MyBot(commands.AutoShardedBot):
     def __init__(self) -> None:
-        super().__init__(command_prefix='!', intents=intents)
+        super().__init__(**client_options(), **shard_options())
         self.db = GameStatsDatabase()
+        self.response_timings = ResponseTimings()
+        self.cluster_id = os.getenv('CLUSTER_ID') or f'{socket.gethostname()}:{os.getpid()}'
         self.presence_data = {
             'r6s': {
                 'game_name': 'Rainbow Six Siege',
@@ -83,40 +122,58 @@ class MyBot(commands.Bot):
             ]
         }
         
-        self.current_game = random.choice(['r6s', 'bf6'])
-        self.game_session_start = None
         self.min_session_hours = 2
         self.max_session_hours = 6
-        self.current_session_duration = random.uniform(self.min_session_hours, self.max_session_hours)
+        self.presence_sessions = {}
 
     async def setup_hook(self) -> None:
+        await self.db.initialize_db()
+        print("Database initialized")
         for filename in os.listdir('bot/cogs'):
             if filename.endswith('.py'):
                 cog_name = filename[:-3]
                 await bot.load_extension(f'bot.cogs.{cog_name}')    
 
     async def on_ready(self) -> None:
-        print(f'Logged in as {self.user.name} (ID: {self.user.id})')
-        await self.db.initialize_db()
-        print("Database initialized")
-        self.cycle_presence.start()
-        print("Bot presence cycling started")
+        print(f'Logged in as {self.user.name} (ID: {self.user.id}) on shards {sorted(self.shards)} of {self.shard_count} (cluster {self.cluster_id})')
+        if not self.cycle_presence.is_running():
+            self.cycle_presence.start()
+            print("Bot presence cycling started")
+
+    async def on_shard_ready(self, shard_id) -> None:
+        print(f'Shard {shard_id} ready')
+        await self.update_presence(shard_id)
+
+    async def close(self) -> None:
+        await super().close()
+        await self.db.close()
 
     @tasks.loop(minutes=20)
     async def cycle_presence(self):
+        for shard_id in sorted(self.shards):
+            await self.update_presence(shard_id)
+
+    async def update_presence(self, shard_id):
         try:
-            if self.game_session_start is None:
-                self.game_session_start = discord.utils.utcnow()
-            elapsed_hours = (discord.utils.utcnow() - self.game_session_start).total_seconds() / 3600
+            session = self.presence_sessions.get(shard_id)
+            if session is None:
+                session = {
+                    'game': random.choice(['r6s', 'bf6']),
+                    'start': discord.utils.utcnow(),
+                    'duration': random.uniform(self.min_session_hours, self.max_session_hours)
+                }
+                self.presence_sessions[shard_id] = session
+            elapsed_hours = (discord.utils.utcnow() - session['start']).total_seconds() / 3600
             
-            if elapsed_hours >= self.current_session_duration:
+            if elapsed_hours >= session['duration']:
                 if random.random() < 0.7:
-                    self.current_game = 'bf6' if self.current_game == 'r6s' else 'r6s'
-                    self.game_session_start = discord.utils.utcnow()
-                    self.current_session_duration = random.uniform(self.min_session_hours, self.max_session_hours)
-                    print(f"Switched to {self.presence_data[self.current_game]['game_name']} for {self.current_session_duration:.1f} hours")
+                    session['game'] = 'bf6' if session['game'] == 'r6s' else 'r6s'
+                    session['start'] = discord.utils.utcnow()
+                    session['duration'] = random.uniform(self.min_session_hours, self.max_session_hours)
+                    elapsed_hours = 0
+                    print(f"Shard {shard_id} switched to {self.presence_data[session['game']]['game_name']} for {session['duration']:.1f} hours")
             
-            game_data = self.presence_data[self.current_game]    
+            game_data = self.presence_data[session['game']]    
             map_name = random.choice(game_data['maps'])
             activity_type = random.choice(game_data['activities'])
             status = random.choice(self.presence_data['statuses'])
@@ -128,13 +185,14 @@ class MyBot(commands.Bot):
                     name=game_data['game_name'],
                     state=state
                 ),
-                status=status
+                status=status,
+                shard_id=shard_id
             )
             
-            remaining_hours = self.current_session_duration - elapsed_hours
-            print(f"Presence updated: {game_data['game_name']} - {state} (Status: {status.name}) | Session: {remaining_hours:.1f}h remaining")
+            remaining_hours = session['duration'] - elapsed_hours
+            print(f"Presence updated on shard {shard_id}: {game_data['game_name']} - {state} (Status: {status.name}) | Session: {remaining_hours:.1f}h remaining")
         except Exception as e:
-            print(f"Error updating presence: {e}")
+            print(f"Error updating presence on shard {shard_id}: {e}")
 
     @cycle_presence.before_loop
     async def before_cycle_presence(self):
@@ -0,0 +1,55 @@
+-- Atomic upsert-and-increment for game_stats.
+-- Replaces the select + update round trip in GameStatsDatabase.insert_or_update_stat
+-- so concurrent edits to the same (server_id, user_id, game_name) row never lose updates.
+
+create unique index if not exists game_stats_server_user_game_key
+    on game_stats (server_id, user_id, game_name);
+
+create or replace function increment_game_stats(
+    p_server_id text,
+    p_user_id text,
+    p_game_name text,
+    p_tournaments_played bigint default 0,
+    p_tournaments_won bigint default 0,
+    p_earnings bigint default 0,
+    p_kills bigint default 0,
+    p_deaths bigint default 0,
+    p_wins bigint default 0,
+    p_losses bigint default 0
+)
+returns setof game_stats
+language sql
+as $$
+    insert into game_stats as gs (
+        server_id, user_id, game_name,
+        tournaments_played, tournaments_won, earnings,
+        kills, deaths, kd, wins, losses, wl
+    )
+    values (
+        p_server_id, p_user_id, p_game_name,
+        p_tournaments_played, p_tournaments_won, p_earnings,
+        p_kills, p_deaths,
+        case when p_deaths > 0 then p_kills::float8 / p_deaths else 0 end,
+        p_wins, p_losses,
+        case when p_losses > 0 then p_wins::float8 / p_losses else 0 end
+    )
+    on conflict (server_id, user_id, game_name) do update set
+        tournaments_played = gs.tournaments_played + excluded.tournaments_played,
+        tournaments_won = gs.tournaments_won + excluded.tournaments_won,
+        earnings = gs.earnings + excluded.earnings,
+        kills = gs.kills + excluded.kills,
+        deaths = gs.deaths + excluded.deaths,
+        kd = case
+            when gs.deaths + excluded.deaths > 0
+            then (gs.kills + excluded.kills)::float8 / (gs.deaths + excluded.deaths)
+            else 0
+        end,
+        wins = gs.wins + excluded.wins,
+        losses = gs.losses + excluded.losses,
+        wl = case
+            when gs.losses + excluded.losses > 0
+            then (gs.wins + excluded.wins)::float8 / (gs.losses + excluded.losses)
+            else 0
+        end
+    returning gs.*;
+$$;
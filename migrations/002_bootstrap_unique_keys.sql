@@ -0,0 +1,7 @@
+-- Natural keys used as on_conflict targets by the bulk member bootstrap.
+
+create unique index if not exists user_profiles_server_user_key
+    on user_profiles (server_id, user_id);
+
+create unique index if not exists player_left_server_user_key
+    on player_left (server_id, user_id);
@@ -0,0 +1,29 @@
+-- Per-stat indexes so ranked leaderboard pages are an index range scan
+-- (GameStatsDatabase.get_ranked_stats) instead of a full guild sort.
+
+create index if not exists game_stats_rank_tournaments_played_idx
+    on game_stats (server_id, game_name, tournaments_played, user_id);
+
+create index if not exists game_stats_rank_tournaments_won_idx
+    on game_stats (server_id, game_name, tournaments_won, user_id);
+
+create index if not exists game_stats_rank_earnings_idx
+    on game_stats (server_id, game_name, earnings, user_id);
+
+create index if not exists game_stats_rank_kills_idx
+    on game_stats (server_id, game_name, kills, user_id);
+
+create index if not exists game_stats_rank_deaths_idx
+    on game_stats (server_id, game_name, deaths, user_id);
+
+create index if not exists game_stats_rank_kd_idx
+    on game_stats (server_id, game_name, kd, user_id);
+
+create index if not exists game_stats_rank_wins_idx
+    on game_stats (server_id, game_name, wins, user_id);
+
+create index if not exists game_stats_rank_losses_idx
+    on game_stats (server_id, game_name, losses, user_id);
+
+create index if not exists game_stats_rank_wl_idx
+    on game_stats (server_id, game_name, wl, user_id);
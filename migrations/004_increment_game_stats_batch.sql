@@ -0,0 +1,52 @@
+-- Batched form of increment_game_stats used by the stat write-behind queue.
+-- p_rows is a JSON array of {server_id, user_id, game_name, <counter deltas>};
+-- the queue merges deltas per key, so each key appears at most once per call.
+
+create or replace function increment_game_stats_batch(p_rows jsonb)
+returns setof game_stats
+language sql
+as $$
+    insert into game_stats as gs (
+        server_id, user_id, game_name,
+        tournaments_played, tournaments_won, earnings,
+        kills, deaths, kd, wins, losses, wl
+    )
+    select
+        r.server_id, r.user_id, r.game_name,
+        coalesce(r.tournaments_played, 0), coalesce(r.tournaments_won, 0), coalesce(r.earnings, 0),
+        coalesce(r.kills, 0), coalesce(r.deaths, 0),
+        case when coalesce(r.deaths, 0) > 0 then r.kills::float8 / r.deaths else 0 end,
+        coalesce(r.wins, 0), coalesce(r.losses, 0),
+        case when coalesce(r.losses, 0) > 0 then r.wins::float8 / r.losses else 0 end
+    from jsonb_to_recordset(p_rows) as r(
+        server_id text,
+        user_id text,
+        game_name text,
+        tournaments_played bigint,
+        tournaments_won bigint,
+        earnings bigint,
+        kills bigint,
+        deaths bigint,
+        wins bigint,
+        losses bigint
+    )
+    on conflict (server_id, user_id, game_name) do update set
+        tournaments_played = gs.tournaments_played + excluded.tournaments_played,
+        tournaments_won = gs.tournaments_won + excluded.tournaments_won,
+        earnings = gs.earnings + excluded.earnings,
+        kills = gs.kills + excluded.kills,
+        deaths = gs.deaths + excluded.deaths,
+        kd = case
+            when gs.deaths + excluded.deaths > 0
+            then (gs.kills + excluded.kills)::float8 / (gs.deaths + excluded.deaths)
+            else 0
+        end,
+        wins = gs.wins + excluded.wins,
+        losses = gs.losses + excluded.losses,
+        wl = case
+            when gs.losses + excluded.losses > 0
+            then (gs.wins + excluded.wins)::float8 / (gs.losses + excluded.losses)
+            else 0
+        end
+    returning gs.*;
+$$;
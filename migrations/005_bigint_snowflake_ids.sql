@@ -0,0 +1,118 @@
+-- Store Discord snowflakes as bigint instead of text.
+-- GameStatsDatabase normalizes every server_id/user_id to int before it reaches
+-- the store, so lookups compare integers and hit the same (server_id, user_id)
+-- indexes regardless of whether a call site had an int or a str. Existing
+-- indexes and unique keys are rebuilt by the column type change.
+
+drop function if exists increment_game_stats(text, text, text, bigint, bigint, bigint, bigint, bigint, bigint, bigint);
+drop function if exists increment_game_stats_batch(jsonb);
+
+alter table game_stats
+    alter column server_id type bigint using server_id::bigint,
+    alter column user_id type bigint using user_id::bigint;
+
+alter table user_profiles
+    alter column server_id type bigint using server_id::bigint,
+    alter column user_id type bigint using user_id::bigint;
+
+alter table player_left
+    alter column server_id type bigint using server_id::bigint,
+    alter column user_id type bigint using user_id::bigint;
+
+create or replace function increment_game_stats(
+    p_server_id bigint,
+    p_user_id bigint,
+    p_game_name text,
+    p_tournaments_played bigint default 0,
+    p_tournaments_won bigint default 0,
+    p_earnings bigint default 0,
+    p_kills bigint default 0,
+    p_deaths bigint default 0,
+    p_wins bigint default 0,
+    p_losses bigint default 0
+)
+returns setof game_stats
+language sql
+as $$
+    insert into game_stats as gs (
+        server_id, user_id, game_name,
+        tournaments_played, tournaments_won, earnings,
+        kills, deaths, kd, wins, losses, wl
+    )
+    values (
+        p_server_id, p_user_id, p_game_name,
+        p_tournaments_played, p_tournaments_won, p_earnings,
+        p_kills, p_deaths,
+        case when p_deaths > 0 then p_kills::float8 / p_deaths else 0 end,
+        p_wins, p_losses,
+        case when p_losses > 0 then p_wins::float8 / p_losses else 0 end
+    )
+    on conflict (server_id, user_id, game_name) do update set
+        tournaments_played = gs.tournaments_played + excluded.tournaments_played,
+        tournaments_won = gs.tournaments_won + excluded.tournaments_won,
+        earnings = gs.earnings + excluded.earnings,
+        kills = gs.kills + excluded.kills,
+        deaths = gs.deaths + excluded.deaths,
+        kd = case
+            when gs.deaths + excluded.deaths > 0
+            then (gs.kills + excluded.kills)::float8 / (gs.deaths + excluded.deaths)
+            else 0
+        end,
+        wins = gs.wins + excluded.wins,
+        losses = gs.losses + excluded.losses,
+        wl = case
+            when gs.losses + excluded.losses > 0
+            then (gs.wins + excluded.wins)::float8 / (gs.losses + excluded.losses)
+            else 0
+        end
+    returning gs.*;
+$$;
+
+create or replace function increment_game_stats_batch(p_rows jsonb)
+returns setof game_stats
+language sql
+as $$
+    insert into game_stats as gs (
+        server_id, user_id, game_name,
+        tournaments_played, tournaments_won, earnings,
+        kills, deaths, kd, wins, losses, wl
+    )
+    select
+        r.server_id, r.user_id, r.game_name,
+        coalesce(r.tournaments_played, 0), coalesce(r.tournaments_won, 0), coalesce(r.earnings, 0),
+        coalesce(r.kills, 0), coalesce(r.deaths, 0),
+        case when coalesce(r.deaths, 0) > 0 then r.kills::float8 / r.deaths else 0 end,
+        coalesce(r.wins, 0), coalesce(r.losses, 0),
+        case when coalesce(r.losses, 0) > 0 then r.wins::float8 / r.losses else 0 end
+    from jsonb_to_recordset(p_rows) as r(
+        server_id bigint,
+        user_id bigint,
+        game_name text,
+        tournaments_played bigint,
+        tournaments_won bigint,
+        earnings bigint,
+        kills bigint,
+        deaths bigint,
+        wins bigint,
+        losses bigint
+    )
+    on conflict (server_id, user_id, game_name) do update set
+        tournaments_played = gs.tournaments_played + excluded.tournaments_played,
+        tournaments_won = gs.tournaments_won + excluded.tournaments_won,
+        earnings = gs.earnings + excluded.earnings,
+        kills = gs.kills + excluded.kills,
+        deaths = gs.deaths + excluded.deaths,
+        kd = case
+            when gs.deaths + excluded.deaths > 0
+            then (gs.kills + excluded.kills)::float8 / (gs.deaths + excluded.deaths)
+            else 0
+        end,
+        wins = gs.wins + excluded.wins,
+        losses = gs.losses + excluded.losses,
+        wl = case
+            when gs.losses + excluded.losses > 0
+            then (gs.wins + excluded.wins)::float8 / (gs.losses + excluded.losses)
+            else 0
+        end
+    returning gs.*;
+$$;
@@ -0,0 +1,113 @@
+-- Maintain kd/wl and the ascending-stat sort keys in the table itself.
+-- kd and wl become generated columns, so no write path computes them anymore.
+-- deaths_rank/losses_rank hold the counter with zero mapped to null. A single
+-- "order by deaths_rank asc nulls last, user_id" then ranks fewest deaths first
+-- with zero-death players last, the same order bot.stats.rank_key gives the
+-- in-process index.
+
+drop function if exists increment_game_stats(bigint, bigint, text, bigint, bigint, bigint, bigint, bigint, bigint, bigint);
+drop function if exists increment_game_stats_batch(jsonb);
+
+drop index if exists game_stats_rank_kd_idx;
+drop index if exists game_stats_rank_wl_idx;
+drop index if exists game_stats_rank_deaths_idx;
+drop index if exists game_stats_rank_losses_idx;
+
+alter table game_stats
+    drop column kd,
+    drop column wl;
+
+alter table game_stats
+    add column kd float8 generated always as (
+        case when deaths > 0 then kills::float8 / deaths else 0 end
+    ) stored,
+    add column wl float8 generated always as (
+        case when losses > 0 then wins::float8 / losses else 0 end
+    ) stored,
+    add column deaths_rank bigint generated always as (nullif(deaths, 0)) stored,
+    add column losses_rank bigint generated always as (nullif(losses, 0)) stored;
+
+create index if not exists game_stats_rank_kd_idx
+    on game_stats (server_id, game_name, kd, user_id);
+
+create index if not exists game_stats_rank_wl_idx
+    on game_stats (server_id, game_name, wl, user_id);
+
+create index if not exists game_stats_rank_deaths_idx
+    on game_stats (server_id, game_name, deaths_rank asc nulls last, user_id);
+
+create index if not exists game_stats_rank_losses_idx
+    on game_stats (server_id, game_name, losses_rank asc nulls last, user_id);
+
+create or replace function increment_game_stats(
+    p_server_id bigint,
+    p_user_id bigint,
+    p_game_name text,
+    p_tournaments_played bigint default 0,
+    p_tournaments_won bigint default 0,
+    p_earnings bigint default 0,
+    p_kills bigint default 0,
+    p_deaths bigint default 0,
+    p_wins bigint default 0,
+    p_losses bigint default 0
+)
+returns setof game_stats
+language sql
+as $$
+    insert into game_stats as gs (
+        server_id, user_id, game_name,
+        tournaments_played, tournaments_won, earnings,
+        kills, deaths, wins, losses
+    )
+    values (
+        p_server_id, p_user_id, p_game_name,
+        p_tournaments_played, p_tournaments_won, p_earnings,
+        p_kills, p_deaths, p_wins, p_losses
+    )
+    on conflict (server_id, user_id, game_name) do update set
+        tournaments_played = gs.tournaments_played + excluded.tournaments_played,
+        tournaments_won = gs.tournaments_won + excluded.tournaments_won,
+        earnings = gs.earnings + excluded.earnings,
+        kills = gs.kills + excluded.kills,
+        deaths = gs.deaths + excluded.deaths,
+        wins = gs.wins + excluded.wins,
+        losses = gs.losses + excluded.losses
+    returning gs.*;
+$$;
+
+create or replace function increment_game_stats_batch(p_rows jsonb)
+returns setof game_stats
+language sql
+as $$
+    insert into game_stats as gs (
+        server_id, user_id, game_name,
+        tournaments_played, tournaments_won, earnings,
+        kills, deaths, wins, losses
+    )
+    select
+        r.server_id, r.user_id, r.game_name,
+        coalesce(r.tournaments_played, 0), coalesce(r.tournaments_won, 0), coalesce(r.earnings, 0),
+        coalesce(r.kills, 0), coalesce(r.deaths, 0),
+        coalesce(r.wins, 0), coalesce(r.losses, 0)
+    from jsonb_to_recordset(p_rows) as r(
+        server_id bigint,
+        user_id bigint,
+        game_name text,
+        tournaments_played bigint,
+        tournaments_won bigint,
+        earnings bigint,
+        kills bigint,
+        deaths bigint,
+        wins bigint,
+        losses bigint
+    )
+    on conflict (server_id, user_id, game_name) do update set
+        tournaments_played = gs.tournaments_played + excluded.tournaments_played,
+        tournaments_won = gs.tournaments_won + excluded.tournaments_won,
+        earnings = gs.earnings + excluded.earnings,
+        kills = gs.kills + excluded.kills,
+        deaths = gs.deaths + excluded.deaths,
+        wins = gs.wins + excluded.wins,
+        losses = gs.losses + excluded.losses
+    returning gs.*;
+$$;
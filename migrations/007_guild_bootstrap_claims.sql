@@ -0,0 +1,35 @@
+-- Coordination table for sharded startup. Each shard cluster claims a guild
+-- before bootstrapping its members; a claim younger than p_stale_after_seconds
+-- (whether finished or still running) makes other clusters and re-identifying
+-- shards skip that guild.
+
+create table if not exists guild_bootstrap (
+    server_id bigint primary key,
+    shard_id integer not null,
+    cluster_id text not null,
+    members integer,
+    claimed_at timestamptz not null default now()
+);
+
+create or replace function claim_guild_bootstrap(
+    p_server_id bigint,
+    p_shard_id integer,
+    p_cluster_id text,
+    p_stale_after_seconds double precision
+)
+returns boolean
+language sql
+as $$
+    with claimed as (
+        insert into guild_bootstrap as gb (server_id, shard_id, cluster_id, members, claimed_at)
+        values (p_server_id, p_shard_id, p_cluster_id, null, now())
+        on conflict (server_id) do update set
+            shard_id = excluded.shard_id,
+            cluster_id = excluded.cluster_id,
+            members = null,
+            claimed_at = excluded.claimed_at
+        where gb.claimed_at < now() - make_interval(secs => p_stale_after_seconds)
+        returning 1
+    )
+    select exists (select 1 from claimed);
+$$;
@@ -0,0 +1,6 @@
+-- Last known guild display name per profile. The bot no longer caches every
+-- member, so leaderboards and the profile editor fall back to this column
+-- when a user is not in the member cache.
+
+alter table user_profiles
+    add column if not exists display_name text not null default '';
@@ -0,0 +1,36 @@
+-- Profile card read used by /stats profile: the user's profile plus their
+-- main-game stats row in one round trip. A missing profile is created with
+-- the same defaults the bot uses, so a first-time lookup needs no follow-up
+-- insert and re-read.
+
+create or replace function get_profile_card(p_server_id bigint, p_user_id bigint)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_profile user_profiles;
+begin
+    insert into user_profiles (
+        server_id, user_id, display_name,
+        gaming_bio, main_game, social_links, embed_color, timezone,
+        team_affiliation, bf6_favorite_class, r6s_role, r6s_favorite_operator
+    )
+    values (p_server_id, p_user_id, '', '', 'r6s', '{}', '0x00d4ff', 'UTC', '', '', '', '')
+    on conflict (server_id, user_id) do nothing;
+
+    select * into v_profile
+    from user_profiles
+    where server_id = p_server_id and user_id = p_user_id;
+
+    return jsonb_build_object(
+        'profile', to_jsonb(v_profile),
+        'stats', (
+            select to_jsonb(gs)
+            from game_stats gs
+            where gs.server_id = p_server_id
+              and gs.user_id = p_user_id
+              and gs.game_name = v_profile.main_game
+        )
+    );
+end;
+$$;
@@ -0,0 +1,38 @@
+-- Idempotent row creation for user_profiles and player_left. Each call inserts
+-- the row if it is missing and returns the stored row either way, so callers
+-- need neither a select before the insert nor a re-read after it. The
+-- do-update is a deliberate no-op: unlike do-nothing it makes returning
+-- yield the existing row, and concurrent callers serialize on the key.
+
+create or replace function ensure_user_profile(
+    p_server_id bigint,
+    p_user_id bigint,
+    p_display_name text default ''
+)
+returns setof user_profiles
+language sql
+as $$
+    insert into user_profiles as up (
+        server_id, user_id, display_name,
+        gaming_bio, main_game, social_links, embed_color, timezone,
+        team_affiliation, bf6_favorite_class, r6s_role, r6s_favorite_operator
+    )
+    values (p_server_id, p_user_id, p_display_name, '', 'r6s', '{}', '0x00d4ff', 'UTC', '', '', '', '')
+    on conflict (server_id, user_id) do update set user_id = up.user_id
+    returning up.*;
+$$;
+
+create or replace function ensure_player_left(
+    p_server_id bigint,
+    p_user_id bigint,
+    p_user_name text,
+    p_display_name text
+)
+returns setof player_left
+language sql
+as $$
+    insert into player_left as pl (server_id, user_id, user_name, display_name)
+    values (p_server_id, p_user_id, p_user_name, p_display_name)
+    on conflict (server_id, user_id) do update set user_id = pl.user_id
+    returning pl.*;
+$$;
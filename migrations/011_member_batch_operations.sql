@@ -0,0 +1,90 @@
+-- Multi-game member operations, each a single request and transaction.
+--
+-- delete_all_user_data removes a user's stats, profile and player_left rows
+-- and returns the game names whose stats were deleted.
+-- reset_user_stats sets every counter to zero for the given games, creating
+-- missing rows, and returns the resulting rows.
+-- init_member handles a member join: it clears any player_left record,
+-- creates missing stat rows for the given games and the profile (refreshing
+-- its display name), and reports whether the member was rejoining.
+
+create or replace function delete_all_user_data(p_server_id bigint, p_user_id bigint)
+returns setof text
+language plpgsql
+as $$
+begin
+    delete from user_profiles where server_id = p_server_id and user_id = p_user_id;
+    delete from player_left where server_id = p_server_id and user_id = p_user_id;
+    return query
+        delete from game_stats where server_id = p_server_id and user_id = p_user_id
+        returning game_name;
+end;
+$$;
+
+create or replace function reset_user_stats(p_server_id bigint, p_user_id bigint, p_games text[])
+returns setof game_stats
+language sql
+as $$
+    insert into game_stats as gs (
+        server_id, user_id, game_name,
+        tournaments_played, tournaments_won, earnings, kills, deaths, wins, losses
+    )
+    select p_server_id, p_user_id, g, 0, 0, 0, 0, 0, 0, 0
+    from unnest(p_games) as g
+    on conflict (server_id, user_id, game_name) do update set
+        tournaments_played = 0,
+        tournaments_won = 0,
+        earnings = 0,
+        kills = 0,
+        deaths = 0,
+        wins = 0,
+        losses = 0
+    returning gs.*;
+$$;
+
+create or replace function init_member(
+    p_server_id bigint,
+    p_user_id bigint,
+    p_display_name text,
+    p_games text[]
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_rejoined boolean;
+    v_profile user_profiles;
+begin
+    delete from player_left where server_id = p_server_id and user_id = p_user_id;
+    v_rejoined := found;
+
+    insert into game_stats (
+        server_id, user_id, game_name,
+        tournaments_played, tournaments_won, earnings, kills, deaths, wins, losses
+    )
+    select p_server_id, p_user_id, g, 0, 0, 0, 0, 0, 0, 0
+    from unnest(p_games) as g
+    on conflict (server_id, user_id, game_name) do nothing;
+
+    insert into user_profiles (
+        server_id, user_id, display_name,
+        gaming_bio, main_game, social_links, embed_color, timezone,
+        team_affiliation, bf6_favorite_class, r6s_role, r6s_favorite_operator
+    )
+    values (p_server_id, p_user_id, p_display_name, '', 'r6s', '{}', '0x00d4ff', 'UTC', '', '', '', '')
+    on conflict (server_id, user_id) do update set display_name = excluded.display_name
+    returning * into v_profile;
+
+    return jsonb_build_object(
+        'rejoined', v_rejoined,
+        'profile', to_jsonb(v_profile),
+        'stats', coalesce((
+            select jsonb_agg(to_jsonb(gs))
+            from game_stats gs
+            where gs.server_id = p_server_id
+              and gs.user_id = p_user_id
+              and gs.game_name = any(p_games)
+        ), '[]'::jsonb)
+    );
+end;
+$$;
@@ -0,0 +1,40 @@
+-- Batched form of init_member used by the member lifecycle pipeline.
+-- p_members is a JSON array of {server_id, user_id, display_name}; the
+-- pipeline coalesces events per member, so each member appears at most once
+-- per call. Returns the members' stat rows for the given games.
+
+create or replace function init_members(p_members jsonb, p_games text[])
+returns setof game_stats
+language plpgsql
+as $$
+begin
+    delete from player_left pl
+    using jsonb_to_recordset(p_members) as m(server_id bigint, user_id bigint, display_name text)
+    where pl.server_id = m.server_id and pl.user_id = m.user_id;
+
+    insert into game_stats (
+        server_id, user_id, game_name,
+        tournaments_played, tournaments_won, earnings, kills, deaths, wins, losses
+    )
+    select m.server_id, m.user_id, g, 0, 0, 0, 0, 0, 0, 0
+    from jsonb_to_recordset(p_members) as m(server_id bigint, user_id bigint, display_name text)
+    cross join unnest(p_games) as g
+    on conflict (server_id, user_id, game_name) do nothing;
+
+    insert into user_profiles (
+        server_id, user_id, display_name,
+        gaming_bio, main_game, social_links, embed_color, timezone,
+        team_affiliation, bf6_favorite_class, r6s_role, r6s_favorite_operator
+    )
+    select m.server_id, m.user_id, coalesce(m.display_name, ''), '', 'r6s', '{}', '0x00d4ff', 'UTC', '', '', '', ''
+    from jsonb_to_recordset(p_members) as m(server_id bigint, user_id bigint, display_name text)
+    on conflict (server_id, user_id) do update set display_name = excluded.display_name;
+
+    return query
+        select gs.*
+        from game_stats gs
+        join jsonb_to_recordset(p_members) as m(server_id bigint, user_id bigint, display_name text)
+            on gs.server_id = m.server_id and gs.user_id = m.user_id
+        where gs.game_name = any(p_games);
+end;
+$$;
@@ -0,0 +1,33 @@
+-- Match the descending rank indexes to the leaderboard query order.
+-- The indexes from 003/006 are (stat asc, user_id asc); read backwards they
+-- give "stat desc nulls first, user_id desc", not the "stat desc nulls last,
+-- user_id asc" that ranked_page asks for, so Postgres sorted the guild anyway.
+-- deaths_rank/losses_rank already match their ascending order (006).
+
+drop index if exists game_stats_rank_tournaments_played_idx;
+create index if not exists game_stats_rank_tournaments_played_idx
+    on game_stats (server_id, game_name, tournaments_played desc nulls last, user_id);
+
+drop index if exists game_stats_rank_tournaments_won_idx;
+create index if not exists game_stats_rank_tournaments_won_idx
+    on game_stats (server_id, game_name, tournaments_won desc nulls last, user_id);
+
+drop index if exists game_stats_rank_earnings_idx;
+create index if not exists game_stats_rank_earnings_idx
+    on game_stats (server_id, game_name, earnings desc nulls last, user_id);
+
+drop index if exists game_stats_rank_kills_idx;
+create index if not exists game_stats_rank_kills_idx
+    on game_stats (server_id, game_name, kills desc nulls last, user_id);
+
+drop index if exists game_stats_rank_kd_idx;
+create index if not exists game_stats_rank_kd_idx
+    on game_stats (server_id, game_name, kd desc nulls last, user_id);
+
+drop index if exists game_stats_rank_wins_idx;
+create index if not exists game_stats_rank_wins_idx
+    on game_stats (server_id, game_name, wins desc nulls last, user_id);
+
+drop index if exists game_stats_rank_wl_idx;
+create index if not exists game_stats_rank_wl_idx
+    on game_stats (server_id, game_name, wl desc nulls last, user_id);
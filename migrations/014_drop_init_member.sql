@@ -0,0 +1,4 @@
+-- Member joins go through init_members (012) via the member lifecycle
+-- pipeline, so the single-member form from 011 has no callers left.
+
+drop function if exists init_member(bigint, bigint, text, text[]);
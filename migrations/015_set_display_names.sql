@@ -0,0 +1,16 @@
+-- Bulk display name refresh for startup bootstrap. Existing profiles keep
+-- whatever name they were created with, so bootstrap sends the members whose
+-- stored name differs from the one in the guild member list.
+-- p_members is a JSON array of {user_id, display_name}.
+
+create or replace function set_display_names(p_server_id bigint, p_members jsonb)
+returns void
+language sql
+as $$
+    update user_profiles up
+    set display_name = m.display_name
+    from jsonb_to_recordset(p_members) as m(user_id bigint, display_name text)
+    where up.server_id = p_server_id
+        and up.user_id = m.user_id
+        and up.display_name is distinct from m.display_name;
+$$;
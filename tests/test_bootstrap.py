@@ -0,0 +1,35 @@
+import asyncio
+from types import SimpleNamespace
+
+from bot.cogs.database_initialization import DatabaseInitializationCog
+from bot.database import GameStatsDatabase
+from bot.sqlite_backend import SQLiteBackend
+
+GUILD_ID = 1406313376279298088
+
+def member(user_id, display_name, bot=False):
+    return SimpleNamespace(id=user_id, display_name=display_name, bot=bot)
+
+def test_bootstrap_writes_display_names_for_existing_profiles(tmp_path):
+    async def main():
+        db = GameStatsDatabase(backend=SQLiteBackend(str(tmp_path / 'stats.db')), leaderboard_index=False)
+        await db.initialize_db()
+        try:
+            await db.create_user_profile(GUILD_ID, 7)
+            await db.create_user_profile(GUILD_ID, 9, 'Carol')
+            cog = DatabaseInitializationCog(SimpleNamespace(db=db))
+            guild = SimpleNamespace(
+                id=GUILD_ID,
+                chunked=True,
+                members=[member(7, 'Alice'), member(8, 'Bob'), member(9, 'Carol'), member(10, 'Robot', bot=True)]
+            )
+
+            counts = await cog.bootstrap_guild(guild)
+            return counts, await db.get_display_names(GUILD_ID, [7, 8, 9, 10])
+        finally:
+            await db.close()
+
+    counts, names = asyncio.run(main())
+
+    assert counts == (3, 1, 1, 6)
+    assert names == {7: 'Alice', 8: 'Bob', 9: 'Carol'}
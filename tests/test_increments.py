@@ -0,0 +1,43 @@
+import asyncio
+
+from bot.database import GameStatsDatabase
+from bot.sqlite_backend import SQLiteBackend
+
+GUILD_ID = 1406313376279298088
+USER_ID = 1
+GAME = 'r6s'
+
+def run_edits(path, edit, admins=32, edits=25):
+    async def main():
+        db = GameStatsDatabase(backend=SQLiteBackend(str(path), max_workers=admins), leaderboard_index=False)
+        await db.initialize_db()
+
+        async def admin():
+            for _ in range(edits):
+                await edit(db)
+
+        await asyncio.gather(*(admin() for _ in range(admins)))
+        # Read the stored row, not the cache, so a lost update cannot hide behind it.
+        rows = await db.backend.select('game_stats', 'kills, deaths, wins, earnings, kd', GUILD_ID, user_id=USER_ID, game_name=GAME)
+        await db.close()
+        return rows
+
+    return asyncio.run(main()), admins * edits
+
+def test_concurrent_increments_are_not_lost(tmp_path):
+    async def edit(db):
+        await db.insert_or_update_stat(GUILD_ID, USER_ID, GAME, kills=2, deaths=1, wins=1, earnings=5)
+
+    rows, total = run_edits(tmp_path / 'stats.db', edit)
+
+    assert rows == [{'kills': total * 2, 'deaths': total, 'wins': total, 'earnings': total * 5, 'kd': 2.0}]
+
+def test_concurrent_batch_increments_are_not_lost(tmp_path):
+    async def edit(db):
+        await db.increment_stats_batch([
+            {'server_id': GUILD_ID, 'user_id': USER_ID, 'game_name': GAME, 'kills': 2, 'deaths': 1, 'wins': 1, 'earnings': 5}
+        ])
+
+    rows, total = run_edits(tmp_path / 'stats.db', edit)
+
+    assert rows == [{'kills': total * 2, 'deaths': total, 'wins': total, 'earnings': total * 5, 'kd': 2.0}]
@@ -0,0 +1,52 @@
+import asyncio
+
+from bot.database import GameStatsDatabase
+from bot.sqlite_backend import SQLiteBackend
+
+GAME = 'r6s'
+
+def with_db(path, body, **index_options):
+    async def main():
+        db = GameStatsDatabase(backend=SQLiteBackend(str(path)), leaderboard_index=True)
+        await db.initialize_db()
+        for option, value in index_options.items():
+            setattr(db.leaderboard_index, option, value)
+        try:
+            return await body(db)
+        finally:
+            await db.close()
+
+    return asyncio.run(main())
+
+def test_small_guilds_are_served_from_ranked_queries(tmp_path):
+    async def body(db):
+        for user_id in (1, 2, 3):
+            await db.insert_or_update_stat(1, user_id, GAME, kills=user_id)
+        small = await db.get_leaderboard_page(1, GAME, 'kills')
+        for user_id in (4, 5):
+            await db.insert_or_update_stat(1, user_id, GAME, kills=user_id)
+        large = await db.get_leaderboard_page(1, GAME, 'kills', limit=2)
+        return small, large, db.leaderboard_index.loaded_keys()
+
+    small, large, loaded_keys = with_db(tmp_path / 'stats.db', body, min_rows=5)
+
+    assert small == ([(3, 3), (2, 2), (1, 1)], 3)
+    assert large == ([(5, 5), (4, 4)], 5)
+    assert loaded_keys == [(1, GAME)]
+
+def test_least_recently_used_guild_is_evicted(tmp_path):
+    async def body(db):
+        for server_id in (1, 2, 3):
+            await db.insert_or_update_stat(server_id, 7, GAME, kills=server_id)
+        await db.get_leaderboard_page(1, GAME, 'kills')
+        await db.get_leaderboard_page(2, GAME, 'kills')
+        await db.get_user_rank(1, GAME, 'kills', 7)
+        await db.get_leaderboard_page(3, GAME, 'kills')
+        evicted = await db.get_leaderboard_page(2, GAME, 'kills')
+        return evicted, db.leaderboard_index.loaded_keys(), db.leaderboard_index.evictions
+
+    evicted, loaded_keys, evictions = with_db(tmp_path / 'stats.db', body, min_rows=0, max_keys=2)
+
+    assert evicted == ([(7, 2)], 1)
+    assert loaded_keys == [(3, GAME), (2, GAME)]
+    assert evictions == 2
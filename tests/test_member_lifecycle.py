@@ -0,0 +1,46 @@
+import asyncio
+
+from bot.member_lifecycle import MemberLifecyclePipeline
+
+GAMES = ('r6s', 'bf6')
+
+class RecordingDatabase:
+    def __init__(self):
+        self.joins = []
+        self.leaves = []
+
+    async def init_members(self, members, games):
+        self.joins.extend((member, games) for member in members)
+
+    async def players_left(self, players):
+        self.leaves.extend(players)
+
+def absorb(*events):
+    db = RecordingDatabase()
+    pipeline = MemberLifecyclePipeline(db)
+    for event in events:
+        pipeline._absorb(event)
+    asyncio.run(pipeline.flush())
+    return db.joins, db.leaves
+
+def test_join_then_leave_cancels_out():
+    joins, leaves = absorb(('join', 1, 7, 'Alice', GAMES), ('leave', 1, 7, 'alice', 'Alice'))
+
+    assert joins == []
+    assert leaves == []
+
+def test_leave_then_join_keeps_the_join():
+    joins, leaves = absorb(('leave', 1, 7, 'alice', 'Alice'), ('join', 1, 7, 'Alice B', GAMES))
+
+    assert joins == [((1, 7, 'Alice B'), GAMES)]
+    assert leaves == []
+
+def test_leave_join_leave_keeps_the_leave():
+    joins, leaves = absorb(
+        ('leave', 1, 7, 'alice', 'Alice'),
+        ('join', 1, 7, 'Alice B', GAMES),
+        ('leave', 1, 7, 'alice', 'Alice B')
+    )
+
+    assert joins == []
+    assert leaves == [(1, 7, 'alice', 'Alice B')]
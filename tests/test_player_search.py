@@ -0,0 +1,41 @@
+import asyncio
+
+from bot.database import GameStatsDatabase
+from bot.sqlite_backend import SQLiteBackend
+
+GUILD_ID = 1406313376279298088
+
+def test_writes_during_index_load_are_replayed(tmp_path):
+    async def main():
+        db = GameStatsDatabase(backend=SQLiteBackend(str(tmp_path / 'stats.db')), leaderboard_index=False)
+        await db.initialize_db()
+        try:
+            await db.player_left(GUILD_ID, 5, 'ghost', 'Ghost')
+            read = asyncio.Event()
+            written = asyncio.Event()
+            iter_players_left = db.iter_players_left
+
+            async def slow_iter_players_left(server_id):
+                async for player in iter_players_left(server_id):
+                    yield player
+                # The snapshot is read; let the writes land before the load installs it.
+                read.set()
+                await written.wait()
+
+            async def write():
+                await read.wait()
+                await db.delete_player_left(GUILD_ID, 5)
+                await db.player_left(GUILD_ID, 6, 'newbie', 'Newbie')
+                written.set()
+
+            db.iter_players_left = slow_iter_players_left
+            results = await asyncio.gather(db.search_players_left(GUILD_ID, ''), write())
+            return results[0], await db.search_players_left(GUILD_ID, ''), [player async for player in iter_players_left(GUILD_ID)]
+        finally:
+            await db.close()
+
+    during, after, stored = asyncio.run(main())
+
+    assert stored == [(6, 'newbie', 'Newbie')]
+    assert during == stored
+    assert after == stored
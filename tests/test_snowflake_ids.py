@@ -0,0 +1,77 @@
+import asyncio
+
+from bot.database import GameStatsDatabase
+from bot.sqlite_backend import SQLiteBackend
+
+GUILD_ID = 1406313376279298088
+USER_ID = 284720561234567890
+GAME = 'r6s'
+
+def with_db(path, body):
+    async def main():
+        db = GameStatsDatabase(backend=SQLiteBackend(str(path)), leaderboard_index=True)
+        await db.initialize_db()
+        db.leaderboard_index.min_rows = 0
+        try:
+            return await body(db)
+        finally:
+            await db.close()
+
+    return asyncio.run(main())
+
+def test_str_and_int_ids_share_stored_row_and_cache_key(tmp_path):
+    async def body(db):
+        await db.insert_or_update_stat(str(GUILD_ID), str(USER_ID), GAME, kills=3)
+        await db.insert_or_update_stat(GUILD_ID, USER_ID, GAME, kills=4)
+
+        from_str = await db.get_stats(str(GUILD_ID), str(USER_ID), GAME)
+        from_int = await db.get_stats(GUILD_ID, USER_ID, GAME)
+        rows = await db.backend.select('game_stats', 'user_id, kills', GUILD_ID, game_name=GAME)
+        return from_str, from_int, rows, list(db.stats_cache.entries)
+
+    from_str, from_int, rows, cache_keys = with_db(tmp_path / 'stats.db', body)
+
+    assert from_str == from_int
+    assert from_int.kills == 7
+    assert rows == [{'user_id': USER_ID, 'kills': 7}]
+    assert cache_keys == [(GUILD_ID, USER_ID, GAME)]
+
+def test_str_and_int_ids_share_inflight_key(tmp_path):
+    async def body(db):
+        await db.insert_or_update_stat(GUILD_ID, USER_ID, GAME, kills=1)
+        db.stats_cache.clear()
+
+        keys = []
+        run = db.single_flight.run
+
+        def record(key, factory):
+            keys.append(key)
+            return run(key, factory)
+
+        db.single_flight.run = record
+        results = await asyncio.gather(
+            db.get_stats(str(GUILD_ID), str(USER_ID), GAME),
+            db.get_stats(GUILD_ID, USER_ID, GAME)
+        )
+        return results, keys, db.single_flight.stats()
+
+    results, keys, stats = with_db(tmp_path / 'stats.db', body)
+
+    assert results[0] == results[1]
+    assert keys == [('get_stats', GUILD_ID, USER_ID, GAME)] * 2
+    assert stats['deduplicated'] == 1
+
+def test_str_and_int_ids_share_leaderboard_index_key(tmp_path):
+    async def body(db):
+        await db.insert_or_update_stat(GUILD_ID, USER_ID, GAME, kills=5)
+        page = await db.get_leaderboard_page(str(GUILD_ID), GAME, 'kills')
+        await db.insert_or_update_stat(str(GUILD_ID), str(USER_ID), GAME, kills=1)
+        rank = await db.get_user_rank(str(GUILD_ID), GAME, 'kills', str(USER_ID))
+        return page, rank, db.leaderboard_index.loaded_keys(), list(db.leaderboard_index.rows[(GUILD_ID, GAME)])
+
+    page, rank, loaded_keys, indexed_users = with_db(tmp_path / 'stats.db', body)
+
+    assert page == ([(USER_ID, 5)], 1)
+    assert rank == (1, 1, 6)
+    assert loaded_keys == [(GUILD_ID, GAME)]
+    assert indexed_users == [USER_ID]